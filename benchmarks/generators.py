@@ -0,0 +1,127 @@
+"""
+Synthetic data generators for the benchmarks.
+
+All generators are deterministic for a given seed and produce data at 1-minute
+resolution in the formats of the real sources: iTwin IoT piezometer readings,
+the manual transducer Excel workbook and the NWPS manual river elevation file.
+"""
+
+import numpy as np
+import pandas as pd
+
+START = np.datetime64("2024-01-01T00:00:00", "ms")
+MINUTES_PER_DAY = 24 * 60
+
+
+def minute_timestamps(days: float, start: np.datetime64 = START) -> np.ndarray:
+    """Returns `datetime64[ms]` timestamps every minute over `days` days."""
+    n = int(days * MINUTES_PER_DAY)
+    return start + np.arange(n, dtype="timedelta64[m]").astype("timedelta64[ms]")
+
+
+def to_jts_timestamps(timestamps: np.ndarray) -> list[str]:
+    """Formats timestamps as iTwin IoT / JTS strings (`...T17:00:00.000Z`)."""
+    return [f"{ts}Z" for ts in np.datetime_as_string(timestamps, unit="ms")]
+
+
+def piezometer_readings(days: float, seed: int = 0) -> tuple:
+    """
+    Returns the timestamps, vibrating wire frequencies (digits) and
+    temperatures (C) of one piezometer over `days` days.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = minute_timestamps(days)
+    n = len(timestamps)
+    phase = np.arange(n) * (2 * np.pi / MINUTES_PER_DAY)
+    frequency = 7700 + 50 * np.sin(phase / 30) + rng.normal(0, 0.5, n)
+    temperature = 17 + 0.5 * np.sin(phase) + rng.normal(0, 0.01, n)
+    return timestamps, frequency, temperature
+
+
+def piezometer_object_data(days: float, seed: int = 0) -> dict:
+    """
+    Returns the readings of one piezometer in the format of
+    `itwin.query_node_by_dates`: `{"...Z": {"f": ..., "T": ...}, ...}`.
+    """
+    timestamps, frequency, temperature = piezometer_readings(days, seed)
+    return {
+        ts: {"f": f, "T": t}
+        for ts, f, t in zip(
+            to_jts_timestamps(timestamps), frequency.tolist(), temperature.tolist()
+        )
+    }
+
+
+def fleet_readings(sensor_ids: list[str], days: float, seed: int = 0) -> tuple:
+    """
+    Returns the readings of many piezometers as flat arrays, with the sensor
+    ID of every reading: `(sensor_ids, frequency, temperature)`.
+    """
+    ids, frequencies, temperatures = [], [], []
+    for i, sensor_id in enumerate(sensor_ids):
+        timestamps, frequency, temperature = piezometer_readings(days, seed + i)
+        ids.append(np.full(len(timestamps), sensor_id, dtype=object))
+        frequencies.append(frequency)
+        temperatures.append(temperature)
+    return (
+        np.concatenate(ids),
+        np.concatenate(frequencies),
+        np.concatenate(temperatures),
+    )
+
+
+def fleet_devices(devices: dict, sensors: int) -> dict:
+    """
+    Returns `sensors` devices in the format of `devices.json`, cycling through
+    the calibrations of the real devices.
+    """
+    names = list(devices)
+    fleet = {}
+    for i in range(sensors):
+        info = dict(devices[names[i % len(names)]])
+        info["id"] = f"/synthetic/{i}/sensor"
+        fleet[f"SYN-{i:04d}"] = info
+    return fleet
+
+
+def write_transducer_workbook(path: str, sheet: str, days: float, seed: int = 0):
+    """
+    Writes a manual transducer workbook in the layout read by
+    `etl.get_manual_transducer_data`: 13 preamble rows, then a table with
+    `Date/Time` (local time), `TEMPERATURE`, `CONDUCTIVITY` and
+    `compensated elevation` columns.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = minute_timestamps(days)
+    n = len(timestamps)
+    df = pd.DataFrame(
+        {
+            "Date/Time": pd.DatetimeIndex(timestamps).strftime("%Y-%m-%d %H:%M:%S"),
+            "TEMPERATURE": 15 + rng.normal(0, 0.1, n),
+            "CONDUCTIVITY": 450 + rng.normal(0, 5, n),
+            "compensated elevation": 290 + rng.normal(0, 0.05, n),
+        }
+    )
+    preamble = pd.DataFrame({"Serial Number": ["000000"] * 12})
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        preamble.to_excel(writer, sheet_name=sheet, index=False)
+        df.to_excel(writer, sheet_name=sheet, startrow=13, index=False)
+
+
+def write_river_elevation(path: str, days: float, seed: int = 0):
+    """
+    Writes a manual river elevation file in the layout read by
+    `nwps.get_manual_data`: `date,water_elevation,timestamp` with UTC dates.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = pd.DatetimeIndex(minute_timestamps(days))
+    df = pd.DataFrame(
+        {
+            "date": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+            "water_elevation": np.round(300 + rng.normal(0, 1, len(timestamps)), 2),
+            "timestamp": timestamps.tz_localize("UTC")
+            .tz_convert("US/Eastern")
+            .strftime("%Y-%m-%d %H:%M:%S%z"),
+        }
+    )
+    df.to_csv(path, index=False)
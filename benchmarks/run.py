@@ -0,0 +1,305 @@
+"""
+Offline benchmarks of the ETL hot paths.
+
+Every benchmark runs on synthetic data (see `benchmarks/generators.py`) at
+1-minute resolution, without any network access. For each benchmark the
+fastest of `--repeat` runs is reported, along with its throughput in rows per
+second and the peak memory allocated during one extra run traced with
+`tracemalloc`.
+
+Scales:
+
+- `smoke`: one sensor, one day of data. Checks that the suite runs.
+- `realistic`: 14 sensors (the piezometers in `devices.json`), 30 days each
+  (one iTwin window).
+- `stress`: 100 sensors, 90 days each, about 13 million readings.
+- `fleet`: 1000 sensors, 30 days each, about 43 million readings.
+- `multiyear`: 14 sensors, three years (1095 days) each, about 22 million
+  readings.
+
+Per-sensor benchmarks process `days` of data for each of `sensors` sensors,
+one sensor at a time like the ETL, so they report `sensors * days` worth of
+rows and the peak memory of one sensor. The fleet benchmark processes the
+readings of all sensors in a single call. The manual transducer and NWPS files
+hold one series each and are read with `days` of data.
+
+Some benchmarks are capped below the largest scales, see `LIMITS`: the fleet
+benchmark holds every reading in memory at once, so it runs with at most 100
+sensors and 90 days (the `stress` scale), and the transducer workbook is
+written with at most 365 days, well within the row limit of Excel. Every
+result records the sensors and days it actually ran with.
+
+Usage:
+
+    python -m benchmarks.run --scale realistic --output results.json
+"""
+
+import argparse
+from datetime import datetime, timezone
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks import generators
+from bf_goodrich import compute, etl, nwps
+from bf_goodrich.calibration import CalibrationRegistry
+from eagleio import jts
+from eagleio.api import EagleIOWorkspace
+
+logger = logging.getLogger(__name__)
+
+SCALES = {
+    "smoke": {"sensors": 1, "days": 1},
+    "realistic": {"sensors": 14, "days": 30},
+    "stress": {"sensors": 100, "days": 90},
+    "fleet": {"sensors": 1000, "days": 30},
+    "multiyear": {"sensors": 14, "days": 365 * 3},
+}
+
+# Largest sensors and days some benchmarks run with, whatever the scale
+LIMITS = {
+    "compute_piezo_elevations_fleet": {"max_sensors": 100, "max_days": 90},
+    "get_manual_transducer_data": {"max_days": 365},
+}
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+PIEZO_NAMES = {"f": "Frequency (digits)", "T": "Temperature (C)"}
+PIEZO_UNITS = {"f": "digits", "T": "C"}
+
+
+def per_sensor(sensors: int, func):
+    """Returns a function calling `func(i)` for each sensor, one at a time."""
+
+    def run():
+        for i in range(sensors):
+            func(i)
+
+    return run
+
+
+def bench_ts_object_data_to_jts(sensors: int, days: float, workdir: str):
+    data = generators.piezometer_object_data(days)
+    return sensors * len(data), per_sensor(
+        sensors,
+        lambda i: EagleIOWorkspace._ts_object_data_to_jts(
+            data, PIEZO_NAMES, PIEZO_UNITS
+        ),
+    )
+
+
+def bench_columns_to_jts(sensors: int, days: float, workdir: str):
+    timestamps, frequency, temperature = generators.piezometer_readings(days)
+    columns = {"f": frequency, "T": temperature}
+    return sensors * len(timestamps), per_sensor(
+        sensors,
+        lambda i: jts.columns_to_jts(timestamps, columns, PIEZO_NAMES, PIEZO_UNITS),
+    )
+
+
+def bench_compute_piezo_elevation(sensors: int, days: float, workdir: str):
+    timestamps, frequency, temperature = generators.piezometer_readings(days)
+    timestamps = generators.to_jts_timestamps(timestamps)
+    frequency, temperature = frequency.tolist(), temperature.tolist()
+    devices = list(generators.fleet_devices(etl.DEVICES, sensors).values())
+    return sensors * len(timestamps), per_sensor(
+        sensors,
+        lambda i: compute.compute_piezo_elevation(
+            timestamps, frequency, temperature, devices[i]
+        ),
+    )
+
+
+def bench_compute_piezo_elevation_columnar(sensors: int, days: float, workdir: str):
+    timestamps, frequency, temperature = generators.piezometer_readings(days)
+    registry = CalibrationRegistry(generators.fleet_devices(etl.DEVICES, sensors))
+    return sensors * len(timestamps), per_sensor(
+        sensors,
+        lambda i: compute.compute_piezo_elevation(
+            timestamps,
+            frequency,
+            temperature,
+            registry.coefficients(registry.names[i], timestamps),
+            columnar=True,
+        ),
+    )
+
+
+def bench_compute_piezo_elevations_fleet(sensors: int, days: float, workdir: str):
+    devices = generators.fleet_devices(etl.DEVICES, sensors)
+    registry = CalibrationRegistry(devices)
+    sensor_ids, frequency, temperature = generators.fleet_readings(
+        [info["id"] for info in devices.values()], days
+    )
+    return len(sensor_ids), lambda: compute.compute_piezo_elevations(
+        sensor_ids, frequency, temperature, registry
+    )
+
+
+def bench_get_latest_date_from_data(sensors: int, days: float, workdir: str):
+    data = generators.piezometer_object_data(days)
+    return sensors * len(data), per_sensor(
+        sensors, lambda i: etl.get_latest_date_from_data(data)
+    )
+
+
+def bench_get_manual_transducer_data(sensors: int, days: float, workdir: str):
+    path = os.path.join(workdir, f"transducer_data_{days}.xlsx")
+    generators.write_transducer_workbook(path, "Stilling Well", days)
+    rows = int(days * generators.MINUTES_PER_DAY)
+    return rows, lambda: etl.get_manual_transducer_data(
+        "Stilling Well", "2000-01-01T00:00:00.000Z", path=path
+    )
+
+
+def bench_nwps_get_manual_data(sensors: int, days: float, workdir: str):
+    path = os.path.join(workdir, f"river_elev_{days}.txt")
+    generators.write_river_elevation(path, days)
+    rows = int(days * generators.MINUTES_PER_DAY)
+    return rows, lambda: nwps.get_manual_data(path)
+
+
+BENCHMARKS = {
+    "ts_object_data_to_jts": bench_ts_object_data_to_jts,
+    "columns_to_jts": bench_columns_to_jts,
+    "compute_piezo_elevation": bench_compute_piezo_elevation,
+    "compute_piezo_elevation_columnar": bench_compute_piezo_elevation_columnar,
+    "compute_piezo_elevations_fleet": bench_compute_piezo_elevations_fleet,
+    "get_latest_date_from_data": bench_get_latest_date_from_data,
+    "get_manual_transducer_data": bench_get_manual_transducer_data,
+    "nwps_get_manual_data": bench_nwps_get_manual_data,
+}
+
+
+def measure(func, repeat: int) -> dict:
+    """
+    Times `func` `repeat` times, then runs it once more under `tracemalloc`
+    to record its peak memory allocation.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": min(times),
+        "mean_seconds": sum(times) / len(times),
+        "peak_memory_bytes": peak,
+    }
+
+
+def get_environment() -> dict:
+    """Returns the versions and commit the benchmarks ran with."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "commit": commit,
+    }
+
+
+def run(scale: str, names: list[str] = None, repeat: int = 3) -> dict:
+    """
+    Runs the benchmarks at a scale.
+
+    Args:
+        scale (str): A key of `SCALES`.
+        names (list[str], optional): The benchmarks to run, all when None.
+        repeat (int): Number of timed runs of each benchmark.
+
+    Returns:
+        dict: The results, with the scale, the environment and one entry per
+            benchmark.
+    """
+    params = SCALES[scale]
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names or BENCHMARKS:
+            limits = LIMITS.get(name, {})
+            sensors = min(params["sensors"], limits.get("max_sensors", np.inf))
+            days = min(params["days"], limits.get("max_days", np.inf))
+            logger.info(
+                f"Running {name} at {scale} scale ({sensors} sensors, {days} days)"
+            )
+            rows, func = BENCHMARKS[name](sensors, days, workdir)
+            result = measure(func, repeat)
+            result["rows_per_second"] = rows / result["seconds"]
+            results.append(
+                {"name": name, "sensors": sensors, "days": days, "rows": rows, **result}
+            )
+            logger.info(
+                f"{name}: {rows} rows in {result['seconds']:.3f} s "
+                f"({result['rows_per_second']:,.0f} rows/s, "
+                f"peak {result['peak_memory_bytes'] / 2**20:.1f} MiB)"
+            )
+            del func
+    return {
+        "scale": scale,
+        **params,
+        "repeat": repeat,
+        "run_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "environment": get_environment(),
+        "results": results,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline ETL benchmarks")
+    arg_parser.add_argument("--scale", choices=list(SCALES), default="realistic")
+    arg_parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=list(BENCHMARKS),
+        help="Benchmark to run; can be repeated. All benchmarks run by default.",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--output",
+        help="Results file. Defaults to benchmarks/results/<scale>.json",
+    )
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    results = run(args.scale, args.benchmark, args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{args.scale}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=4)
+    logger.info(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+This module provides a registry of the piezometer calibrations in
+`devices.json`.
+
+The registry validates the device file once and compiles the calibration
+values, along with the constants derived from them (`poly_c` and the sensor
+elevation), into NumPy arrays. Devices are looked up by name or by iTwin
+sensor ID.
+
+A device may list calibrations that replace its values from a given date,
+e.g. after the sensor was re-zeroed or re-surveyed:
+
+    "LW-02S": {
+        "id": "/loadsensing/.../vw1/sensor",
+        "r0": 8964.4,
+        ...
+        "calibrations": [
+            {"effective_from": "2025-03-01T00:00:00.000Z", "r0": 8970.1}
+        ]
+    }
+
+The top-level values apply until the first effective date; each calibration
+only needs the values it changes.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from bf_goodrich import compute
+
+DEVICES_PATH = os.path.join(os.path.dirname(__file__), "devices.json")
+
+# Values compiled into the registry, in addition to `compute.CALIBRATION_KEYS`
+DERIVED_KEYS = ("poly_c", "sensor_elevation")
+
+# Effective date of the top-level calibration values of a device
+BEGINNING = np.datetime64("0001-01-01T00:00:00.000", "ms")
+
+
+class CalibrationRegistry:
+    """
+    Compiled calibrations of a set of piezometers.
+
+    .. example::
+        registry = CalibrationRegistry.from_json()
+        coefficients = registry.coefficients("LW-02S", timestamps)
+        _, _, elevation = compute.piezo_kernel(frequency, temperature, **coefficients)
+    """
+
+    def __init__(self, devices: dict):
+        """
+        Args:
+            devices (dict): Device name -> device information, in the format of
+                `devices.json`.
+
+        Raises:
+            ValueError: If a device misses a calibration value, has a value that
+                is not a finite number, has a name or iTwin sensor ID that is
+                also the name or sensor ID of another device, or has
+                calibrations that are not in chronological order.
+        """
+        self.names = list(devices)
+        self._index = {}
+        effective_from = []
+        rows = []
+        offsets = [0]
+        for i, (name, info) in enumerate(devices.items()):
+            # Names and sensor IDs share one namespace
+            keys = [name] if info.get("id") is None else [name, info["id"]]
+            for key in keys:
+                if key in self._index:
+                    raise ValueError(
+                        f"Device '{name}' has a name or sensor ID already used "
+                        f"by another device: {key}"
+                    )
+                self._index[key] = i
+
+            # The top-level values apply since the beginning of time
+            values = dict(info)
+            dates = [BEGINNING]
+            versions = [self._validate(name, values)]
+            for calibration in info.get("calibrations", []):
+                values = {**values, **calibration}
+                date = _parse_date(name, calibration.get("effective_from"))
+                if date <= dates[-1]:
+                    raise ValueError(
+                        f"Calibrations of device '{name}' must be in chronological order"
+                    )
+                dates.append(date)
+                versions.append(self._validate(name, values))
+
+            effective_from.extend(dates)
+            rows.extend(versions)
+            offsets.append(len(rows))
+
+        self.effective_from = np.array(effective_from, dtype="datetime64[ms]")
+        self.table = {
+            key: np.array([row[key] for row in rows], dtype=float)
+            for key in compute.CALIBRATION_KEYS + DERIVED_KEYS
+        }
+        self._offsets = np.array(offsets)
+
+    @classmethod
+    def from_json(cls, path: str = DEVICES_PATH) -> "CalibrationRegistry":
+        """Builds the registry from a device file, `devices.json` by default."""
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _validate(name: str, values: dict) -> dict:
+        """
+        Checks the calibration values of a device and returns them along with
+        the derived constants.
+        """
+        row = {}
+        for key in compute.CALIBRATION_KEYS:
+            if key not in values:
+                raise ValueError(f"Device '{name}' is missing '{key}'")
+            value = values[key]
+            if (
+                isinstance(value, bool)
+                or not isinstance(value, (int, float))
+                or not math.isfinite(value)
+            ):
+                raise ValueError(f"Device '{name}' has an invalid '{key}': {value!r}")
+            row[key] = float(value)
+        row["poly_c"] = -row["poly_a"] * row["r0"] ** 2 - row["poly_b"] * row["r0"]
+        row["sensor_elevation"] = row["ground_elev"] - row["sensor_depth"]
+        return row
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index(self, key: str) -> int:
+        """
+        Returns the position of a device, given its name or iTwin sensor ID.
+
+        Raises:
+            KeyError: If the device is unknown.
+        """
+        try:
+            return self._index[key]
+        except KeyError:
+            raise KeyError(f"Device '{key}' not found in the calibration registry")
+
+    def _rows(self, key: str, timestamps=None):
+        """
+        Returns the table row of the calibration of a device in effect at each
+        timestamp, or of its latest calibration when no timestamps are given.
+        """
+        i = self.index(key)
+        start, end = self._offsets[i], self._offsets[i + 1]
+        if timestamps is None:
+            return end - 1
+        positions = np.searchsorted(
+            self.effective_from[start:end], _to_datetime64(timestamps), side="right"
+        )
+        return start + positions - 1
+
+    def _rows_for(self, keys, timestamps=None) -> np.ndarray:
+        """
+        Returns the table row of the calibration in effect for every reading
+        of many devices, see `_rows`.
+        """
+        unique_keys, inverse = np.unique(np.asarray(keys), return_inverse=True)
+        devices = np.array([self.index(k) for k in unique_keys.tolist()], dtype=int)
+        devices = devices[inverse.reshape(-1)]
+        # The latest calibration, then the earlier ones of versioned devices
+        rows = self._offsets[devices + 1] - 1
+        if timestamps is None:
+            return rows
+        timestamps = _to_datetime64(timestamps)
+        for i in np.flatnonzero(np.diff(self._offsets) > 1):
+            mask = devices == i
+            if mask.any():
+                start, end = self._offsets[i], self._offsets[i + 1]
+                positions = np.searchsorted(
+                    self.effective_from[start:end], timestamps[mask], side="right"
+                )
+                rows[mask] = start + positions - 1
+        return rows
+
+    def get(self, key: str) -> dict:
+        """
+        Returns the latest calibration of a device, as a dictionary of floats
+        with the keys of `compute.CALIBRATION_KEYS` and `DERIVED_KEYS`.
+        """
+        row = self._rows(key)
+        return {k: float(values[row]) for k, values in self.table.items()}
+
+    def coefficients(self, key: str, timestamps=None) -> dict:
+        """
+        Returns the calibration values of a device as keyword arguments of
+        `compute.piezo_kernel`.
+
+        Args:
+            key (str): The device name or iTwin sensor ID.
+            timestamps (optional): Reading timestamps, as UTC datetime64 values
+                or ISO 8601 strings such as `2025-02-05T17:00:00.000Z`. When
+                given, the values are arrays holding, for every timestamp, the
+                calibration in effect at that time. Otherwise they are the
+                latest values.
+
+        Returns:
+            dict: With keys `r0`, `t0`, `poly_a`, `poly_b`, `k`, `poly_c` and
+                `sensor_elevation`.
+        """
+        rows = self._rows(key, timestamps)
+        return {k: self.table[k][rows] for k in compute.KERNEL_KEYS}
+
+    def coefficients_for(self, keys, timestamps=None) -> dict:
+        """
+        Returns the calibration values of readings from many devices as
+        keyword arguments of `compute.piezo_kernel`, with one value per
+        reading.
+
+        Args:
+            keys: The device name or iTwin sensor ID of every reading.
+            timestamps (optional): The timestamp of every reading, see
+                `coefficients`. The latest calibrations are used when None.
+
+        Raises:
+            KeyError: If a device is unknown.
+        """
+        rows = self._rows_for(keys, timestamps)
+        return {k: self.table[k][rows] for k in compute.KERNEL_KEYS}
+
+    def compute_elevation(self, key: str, timestamps, frequency, temperature):
+        """
+        Calculates the water elevation of readings of a device, applying the
+        calibration in effect at each reading.
+
+        Returns:
+            np.ndarray: The water elevation of every reading, in feet.
+        """
+        _, _, elevation = compute.piezo_kernel(
+            frequency, temperature, **self.coefficients(key, timestamps)
+        )
+        return elevation
+
+
+def _to_datetime64(timestamps) -> np.ndarray:
+    """Converts UTC datetime64 values or ISO 8601 strings to `datetime64[ms]`."""
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind in "UO":
+        # UTC strings such as `2025-02-05T17:00:00.000Z`
+        timestamps = np.char.rstrip(timestamps.astype(str), "Z")
+    return timestamps.astype("datetime64[ms]")
+
+
+def _parse_date(name: str, value) -> np.datetime64:
+    if not isinstance(value, str):
+        raise ValueError(f"Calibration of device '{name}' has no 'effective_from' date")
+    try:
+        return np.datetime64(value.rstrip("Z"), "ms")
+    except ValueError:
+        raise ValueError(
+            f"Calibration of device '{name}' has an invalid 'effective_from': {value!r}"
+        )
@@ -3,7 +3,16 @@ This module provides functionality to process the raw sensor data from the
 piezometers.
 """
 
-import pandas as pd
+import numpy as np
+
+# Calibration values required for every piezometer, see `devices.json`
+CALIBRATION_KEYS = ("r0", "t0", "poly_a", "poly_b", "k", "ground_elev", "sensor_depth")
+
+# Calibration values accepted by `piezo_kernel`
+KERNEL_KEYS = ("r0", "t0", "poly_a", "poly_b", "k", "poly_c", "sensor_elevation")
+
+# Feet of water per psi
+FT_WATER_PER_PSI = 144 / 62.4
 
 
 def get_pressure_psi(
@@ -69,19 +78,117 @@ def get_pressure_head(
     return head
 
 
+def piezo_kernel(
+    frequency,
+    temperature,
+    r0,
+    t0,
+    poly_a,
+    poly_b,
+    k,
+    sensor_elevation,
+    poly_c=None,
+) -> tuple:
+    """
+    Calculates the pressure, head and water elevation of piezometer readings
+    in a single pass.
+
+    All arguments are scalars or NumPy arrays that broadcast together, so the
+    calibration values can be given per sensor (scalars) or per reading
+    (arrays as long as the readings, see `compute_piezo_elevations`).
+
+    Args:
+        frequency: The vibrating wire frequency in digits.
+        temperature: The temperature in degrees C.
+        r0, t0, poly_a, poly_b, k: The calibration values, see
+            `get_pressure_psi`.
+        sensor_elevation: The elevation of the sensor in feet, i.e. the ground
+            elevation minus the sensor depth.
+        poly_c (optional): The polynomial constant, computed from the other
+            values when None.
+
+    Returns:
+        tuple: The pressure in psi, the head in feet of water and the water
+            elevation in feet, as arrays.
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    temperature = np.asarray(temperature, dtype=float)
+    if poly_c is None:
+        poly_c = -poly_a * r0**2 - poly_b * r0
+    psi = poly_a * frequency**2 + poly_b * frequency + poly_c + (temperature - t0) * k
+    head = psi * FT_WATER_PER_PSI
+    return psi, head, head + sensor_elevation
+
+
+def compute_piezo_elevations(
+    sensor_ids, frequency, temperature, registry, timestamps=None
+) -> np.ndarray:
+    """
+    Calculates the water elevation of readings from many piezometers at once.
+
+    The calibration of every reading is looked up in the registry by sensor
+    ID, and the calibration of all readings runs as one vectorized operation.
+
+    Args:
+        sensor_ids: The iTwin sensor ID, or device name, of every reading.
+        frequency: The vibrating wire frequency of every reading, in digits.
+        temperature: The temperature of every reading, in degrees C.
+        registry (CalibrationRegistry): The calibrations of the sensors.
+        timestamps (optional): The timestamp of every reading. When given,
+            each reading uses the calibration in effect at its time, otherwise
+            the latest calibration of its sensor.
+
+    Returns:
+        np.ndarray: The water elevation of every reading, in feet.
+    """
+    _, _, elevation = piezo_kernel(
+        frequency, temperature, **registry.coefficients_for(sensor_ids, timestamps)
+    )
+    return elevation
+
+
+def _get_coefficients(sensor_info: dict) -> dict:
+    """
+    Returns the keyword arguments of `piezo_kernel` for sensor information
+    from `devices.json`, or for compiled calibration values, e.g. from
+    `CalibrationRegistry.get` or `CalibrationRegistry.coefficients`.
+    """
+    if "sensor_elevation" in sensor_info:
+        return {k: sensor_info[k] for k in KERNEL_KEYS if k in sensor_info}
+    for key in CALIBRATION_KEYS:
+        assert key in sensor_info, f"Sensor info must contain '{key}'"
+    return {
+        "r0": sensor_info["r0"],
+        "t0": sensor_info["t0"],
+        "poly_a": sensor_info["poly_a"],
+        "poly_b": sensor_info["poly_b"],
+        "k": sensor_info["k"],
+        "sensor_elevation": sensor_info["ground_elev"] - sensor_info["sensor_depth"],
+    }
+
+
 def compute_piezo_elevation(
     timestamps: list[str],
     frequency: list[float],
     temperature: list[float],
     sensor_info: dict,
-) -> dict:
+    columnar: bool = False,
+):
     """
     Calculate the water elevation for a piezometer based on frequency and
     temperature readings.
 
     Args:
-        df (pd.DataFrame): The DataFrame containing frequency and temperature data.
-        sensor_info (dict): The sensor information dictionary.
+        timestamps (list[str]): The timestamps of the readings.
+        frequency (list[float]): The vibrating wire frequencies in digits.
+        temperature (list[float]): The temperatures in degrees C.
+        sensor_info (dict): The sensor information dictionary, or compiled
+            calibration values from `CalibrationRegistry.coefficients` (scalars
+            or one value per reading).
+        columnar (bool): Return the timestamps and a dictionary of arrays,
+            `(timestamps, {"water_elevation": array})`, that can be passed
+            as is to `EagleIOWorkspace.load_data_to_datasource(data=...,
+            timestamps=...)`, instead of one dictionary per reading.
 
     Returns:
         dict: A dictionary with timestamps as keys and calculated water elevation
@@ -96,44 +203,47 @@ def compute_piezo_elevation(
               }
             }
     """
-    assert "r0" in sensor_info, "Sensor info must contain 'r0'"
-    assert "t0" in sensor_info, "Sensor info must contain 't0'"
-    assert "poly_a" in sensor_info, "Sensor info must contain 'poly_a'"
-    assert "poly_b" in sensor_info, "Sensor info must contain 'poly_b'"
-    assert "k" in sensor_info, "Sensor info must contain 'k'"
-    assert "ground_elev" in sensor_info, "Sensor info must contain 'ground_elev'"
-    assert "sensor_depth" in sensor_info, "Sensor info must contain 'sensor_depth'"
-
-    df = pd.DataFrame(
-        {
-            "timestamp": timestamps,
-            "frequency": frequency,
-            "temperature": temperature,
-        }
-    )
-
-    df["pressure_psi"] = get_pressure_psi(
-        df["frequency"],
-        df["temperature"],
-        sensor_info["r0"],
-        sensor_info["t0"],
-        sensor_info["poly_a"],
-        sensor_info["poly_b"],
-        sensor_info["k"],
+    _, _, water_elevation = piezo_kernel(
+        frequency, temperature, **_get_coefficients(sensor_info)
     )
+    if columnar:
+        return timestamps, {"water_elevation": water_elevation}
+    return {
+        ts: {"water_elevation": v}
+        for ts, v in zip(timestamps, water_elevation.tolist())
+    }
 
-    df["ft_water"] = get_pressure_head(
-        df["frequency"],
-        df["temperature"],
-        sensor_info["r0"],
-        sensor_info["t0"],
-        sensor_info["poly_a"],
-        sensor_info["poly_b"],
-        sensor_info["k"],
-    )
 
-    sensor_elevation = sensor_info["ground_elev"] - sensor_info["sensor_depth"]
-    df["water_elevation"] = df["ft_water"] + sensor_elevation
+def iter_piezo_elevation(chunks, sensor_info):
+    """
+    Calculates the water elevation of a stream of piezometer readings, one
+    chunk at a time, so that the memory used does not depend on the length of
+    the history.
 
-    df.set_index("timestamp", inplace=True)
-    return df[["water_elevation"]].to_dict(orient="index")
+    Args:
+        chunks: Iterable of `(timestamps, frequency, temperature)` chunks of
+            readings, e.g. a generator reading a file or querying iTwin IoT.
+        sensor_info (dict | Callable): The sensor information dictionary or
+            compiled coefficients, see `compute_piezo_elevation`, or a function
+            returning the coefficients for the timestamps of a chunk, e.g.
+            `functools.partial(registry.coefficients, "LW-02S")`.
+
+    Yields:
+        tuple: `(timestamps, {"water_elevation": array})` for every chunk, the
+            format accepted by `EagleIOWorkspace.stream_chunks_to_datasource`.
+
+    .. example::
+        eagleio.stream_chunks_to_datasource(
+            "LW-02S",
+            iter_piezo_elevation(read_chunks(), sensor_info),
+            names_mapper={"water_elevation": "Water Elevation (ft)"},
+            units={"water_elevation": "ft"},
+        )
+    """
+    if not callable(sensor_info):
+        coefficients = _get_coefficients(sensor_info)
+    for timestamps, frequency, temperature in chunks:
+        if callable(sensor_info):
+            coefficients = sensor_info(timestamps)
+        _, _, water_elevation = piezo_kernel(frequency, temperature, **coefficients)
+        yield timestamps, {"water_elevation": water_elevation}
@@ -13,9 +13,13 @@ DATA SOURCES:
 
 PIEZOMETER ETL:
 - Gets the latest timestamp from Eagle.io for each device.
-- Retrieves sensor data from iTwin IoT in 30-day increments for each device listed in `devices.json`.
+- Retrieves sensor data from iTwin IoT for each device listed in `devices.json`,
+  in windows sized to the density of each sensor's data.
 - Computes water elevation using sensor-specific calibration factors.
+- The next window is fetched from iTwin IoT while the current one is uploaded.
 - Loads raw sensor data and computed water elevation data into Eagle.io.
+- Devices are processed concurrently (`--workers`); a failing device does not
+  stop the others and is reported once all data sources have been loaded.
 
 NWPS ETL:
 - Retrieves water elevation data from the NOAA NWPS API for the gauge KYTK2.
@@ -29,6 +33,8 @@ MANUAL DATA ETL:
 - Uploads the new data to Eagle.io.
 """
 
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dateutil import parser
 import json
@@ -36,21 +42,53 @@ import logging
 import pandas as pd
 from pytz import timezone
 import os
+import queue
 import sys
+import threading
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
 from bf_goodrich import itwin, compute, nwps
+from bf_goodrich.calibration import CalibrationRegistry
 from log.logging_config import setup_logging
 from eagleio.api import EagleIOWorkspace
+from eagleio.dedup import UploadDeduplicator
+from eagleio.state import SyncStateStore
 
-os.environ["ITWIN_IOT_API_TOKEN"] = itwin.get_token()
-
-setup_logging(log_level="INFO", log_directory="logs", app_name="bf-goodrich-piezos")
 logger = logging.getLogger(__name__)
 
 DEVICES = json.load(open(os.path.join(os.path.dirname(__file__), "devices.json"), "r"))
+CALIBRATIONS = CalibrationRegistry(DEVICES)
+
+# Start date used when a datasource has no data in Eagle.io yet
+DEFAULT_START_DATE = "2022-01-01T00:00:00.000Z"
+
+# Eagle.io node tree cache, reused across runs for up to an hour
+EAGLEIO_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".cache")
+EAGLEIO_CACHE_TTL = 3600
+
+# Local record of the last uploaded timestamp of every source. Start dates
+# come from this store and are only reconciled with Eagle.io once a week.
+SYNC_STATE_PATH = os.path.join(EAGLEIO_CACHE_DIR, "sync_state.sqlite")
+SYNC_STATE_RECONCILE_AFTER = timedelta(days=7)
+
+# iTwin access tokens are cached next to the node cache and reused by later
+# runs until shortly before they expire
+itwin.token_provider = itwin.TokenProvider(cache_dir=EAGLEIO_CACHE_DIR)
+
+# Number of piezometers processed concurrently. By default every device gets
+# its own worker, so a run takes as long as its slowest device, up to the
+# number of requests the Eagle.io workspace allows in flight.
+PIEZOMETER_WORKERS = None
+
+# Number of rows targeted by every iTwin IoT query; the query span adapts to
+# the density of each sensor's data
+PIEZOMETER_WINDOW_ROWS = 20000
+
+# Number of iTwin IoT windows fetched ahead of the upload of a device
+PIEZOMETER_PREFETCH_WINDOWS = 1
 
 
 def get_latest_date_from_data(data: dict) -> str:
@@ -72,9 +110,10 @@ def get_latest_date_from_data(data: dict) -> str:
 
     """
     assert isinstance(data, dict), "Data must be a dictionary"
-    keys = list(data.keys())
-    dates = [datetime.strptime(key, "%Y-%m-%dT%H:%M:%S.%fZ") for key in keys]
-    s = max(dates).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    # Timestamps share a fixed-width ISO 8601 format, so the latest one is the
+    # largest string; only that one is parsed and formatted.
+    latest = datetime.strptime(max(data), "%Y-%m-%dT%H:%M:%S.%fZ")
+    s = latest.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     return s.replace(".000000Z", ".000Z")
 
 
@@ -88,12 +127,14 @@ def add_to_date(date: str, days: int) -> str:
     return new_date.replace(".000000Z", ".000Z")
 
 
-def get_manual_transducer_data(name: str, start_date: str) -> dict:
+def get_manual_transducer_data(name: str, start_date: str, path: str = None) -> dict:
     """
     Retrieves manual transducer data from an Excel file formatted to Eagle.io
     API's standard.
 
     Only rows with timestamps after the specified start_date are included.
+    The file defaults to `data/transducer_data.xlsx`; `path` selects another
+    one.
 
     The data is returned in the following format:
 
@@ -112,7 +153,7 @@ def get_manual_transducer_data(name: str, start_date: str) -> dict:
     }
     """
 
-    p = os.path.join(
+    p = path or os.path.join(
         os.path.dirname(__file__),
         "data",
         "transducer_data.xlsx",
@@ -154,82 +195,269 @@ def get_manual_transducer_data(name: str, start_date: str) -> dict:
     return data
 
 
-def get_start_date_from_eagleio(name: str) -> str:
+def get_eagleio_workspace() -> EagleIOWorkspace:
     """
-    Retrieves the latest timestamp from a datasource in Eagle.io by its name.
-    This is used to determine the starting point for data retrieval from iTwin IoT.
+    Returns an Eagle.io workspace for the BF Goodrich project with the node
+    tree cached on disk, compressed uploads, and deduplication of the rows
+    already uploaded by previous runs.
     """
-    eagleio = EagleIOWorkspace(os.environ["BF_GOODRICH_EAGLEIO_KEY"])
-    try:
-        start_date = eagleio.get_latest_timestamp_from_datasource_by_name(name)
-    except ValueError as e:
-        return "2022-01-01T00:00:00.000Z"  # Default start date if datasource not found
-    start_date = parser.parse(start_date)
+    return EagleIOWorkspace(
+        os.environ["BF_GOODRICH_EAGLEIO_KEY"],
+        cache_dir=EAGLEIO_CACHE_DIR,
+        cache_ttl=EAGLEIO_CACHE_TTL,
+        compress=True,
+        deduplicator=UploadDeduplicator(SYNC_STATE_PATH),
+    )
+
+
+def _get_start_date_from_latest(latest_date: str) -> str:
+    """
+    Returns the start date for data retrieval given the latest timestamp in
+    Eagle.io, or the default start date when there is none.
+    """
+    if latest_date is None:
+        return DEFAULT_START_DATE
+    start_date = parser.parse(latest_date)
     start_date = start_date - timedelta(
         days=1
     )  # Start from one day before the latest date
     return start_date.strftime("%Y-%m-%dT%H:%M:%S.%fZ").replace(".000000Z", ".000Z")
 
 
-def main():
+def get_start_dates(
+    names: list[str], eagleio: EagleIOWorkspace, store: SyncStateStore
+) -> dict:
+    """
+    Returns the start date of each source from the local sync state.
+
+    Sources that are unknown locally, or were not reconciled with Eagle.io
+    for `SYNC_STATE_RECONCILE_AFTER`, are looked up in Eagle.io with a single
+    request and their local state is overwritten with the result.
 
-    eagleio = EagleIOWorkspace(os.environ["BF_GOODRICH_EAGLEIO_KEY"])
+    When Eagle.io is behind the local state, the rows uploaded after its
+    latest timestamp were accepted but not stored. They are forgotten by the
+    workspace's deduplicator so that the next upload sends them again.
+    """
+    stale = [
+        name
+        for name in names
+        if store.needs_reconcile(name, SYNC_STATE_RECONCILE_AFTER)
+    ]
+    if stale:
+        logger.info(f"Reconciling sync state with Eagle.io for: {stale}")
+        for name, latest_date in eagleio.get_watermarks(stale).items():
+            if latest_date is None:
+                continue
+            last_timestamp = store.get_last_timestamp(name)
+            store.reconcile(name, latest_date)
+            # Compared as datetimes, whatever the precision of either string
+            watermark = parser.parse(latest_date)
+            if (
+                eagleio.deduplicator is not None
+                and last_timestamp is not None
+                and watermark < parser.parse(last_timestamp)
+            ):
+                logger.warning(
+                    f"{name} is behind the sync state in Eagle.io "
+                    f"({latest_date} < {last_timestamp}), re-uploading"
+                )
+                eagleio.deduplicator.forget(
+                    eagleio.get_datasource_id_by_name(name), watermark
+                )
 
-    # Load Piezometer data from iTwin IoT #####################################
-    for device in DEVICES:
+    return {
+        name: _get_start_date_from_latest(store.get_last_timestamp(name))
+        for name in names
+    }
 
-        logger.info(f"Processing device: {device}")
-        logger.info("Retrieving latest timestamp from Eagle.io")
-        start_date = get_start_date_from_eagleio(device)
-        logger.info(f"Latest timestamp in Eagle.io for {device}: {start_date}")
 
-        while True:
+def _iter_piezometer_windows(device: str, start_date: str):
+    """
+    Queries the iTwin IoT data of a piezometer from `start_date` up to now,
+    in windows sized to return about `PIEZOMETER_WINDOW_ROWS` rows each.
+
+    Yields:
+        tuple: `(start_date, end_date, data, latest_date)` for every window.
+    """
+    window = itwin.AdaptiveWindow(target_rows=PIEZOMETER_WINDOW_ROWS)
+    for start, end, data in itwin.iter_windows(
+        DEVICES[device]["id"], start_date, window
+    ):
+        logger.info(f"Data retrieved for {device} from {start} to {end}")
+        yield start, end, data, get_latest_date_from_data(data)
+
+
+def _prefetch(iterable, maxsize: int = 1):
+    """
+    Iterates over `iterable` in a background thread, keeping up to `maxsize`
+    items ready ahead of the consumer. The producer blocks once the queue is
+    full, so at most `maxsize + 2` items are held in memory at any time.
+
+    An exception raised by the producer is re-raised to the consumer. If the
+    consumer stops early, the producer stops after its current item.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
             try:
-                # Query data from iTwin platform
-                end_date = add_to_date(start_date, 30)
-                data = itwin.query_node_by_dates(
-                    sensor_id=DEVICES[device]["id"],
-                    start_date=start_date,
-                    end_date=end_date,
-                )
-            except Exception as e:
-                raise e
-            else:
-                logger.info(
-                    f"Data retrieved for {device} from {start_date} to {end_date}"
-                )
-                latest_date_i = get_latest_date_from_data(data)
-                if start_date == latest_date_i:
-                    break
-                else:
-                    start_date = latest_date_i
-
-                # Load raw data to Eagle.io
-                logger.info(f"Loading data to Eagle.io")
-                eagleio.load_data_to_datasource(
-                    name=device,
-                    data=data,
-                    names_mapper={"f": "Frequency (digits)", "T": "Temperature (C)"},
-                    units={"f": "digits", "T": "C"},
-                )
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(("item", item)):
+                    return
+        except BaseException as e:
+            put(("error", e))
+        else:
+            put(("done", None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+        producer.join()
+
+
+def process_piezometer(device: str, start_date: str, eagleio, store) -> dict:
+    """
+    Loads the iTwin IoT data of a piezometer to Eagle.io, in windows from
+    `start_date`, along with the computed water elevation.
+
+    Fetching and loading are pipelined: the next window is queried from
+    iTwin IoT while the current one is computed and uploaded to Eagle.io, up
+    to `PIEZOMETER_PREFETCH_WINDOWS` windows ahead.
+
+    Args:
+        device (str): The device name, a key of `DEVICES`.
+        start_date (str): The timestamp to resume from.
+        eagleio (EagleIOWorkspace): The Eagle.io workspace.
+        store (SyncStateStore): The sync state store, updated after every
+            window.
+
+    Returns:
+        dict: With keys `windows`, `rows` and `latest_date`.
+    """
+    logger.info(f"Processing device: {device}")
+    logger.info(f"Start date for {device}: {start_date}")
+    summary = {"windows": 0, "rows": 0, "latest_date": start_date}
 
-                # Calculate water elevation
-                logger.info(f"Calculating water elevation")
-                water_elevation = compute.compute_piezo_elevation(
-                    timestamps=list(data.keys()),
-                    frequency=[d["f"] for d in data.values()],
-                    temperature=[d["T"] for d in data.values()],
-                    sensor_info=DEVICES[device],
-                )
+    windows = _prefetch(
+        _iter_piezometer_windows(device, start_date),
+        maxsize=PIEZOMETER_PREFETCH_WINDOWS,
+    )
+    for _, _, data, latest_date_i in windows:
+        timestamps, columns = itwin.observations_to_columns(data, keys=["f", "T"])
+
+        # Load raw data to Eagle.io
+        logger.info(f"Loading data to Eagle.io for {device}")
+        eagleio.load_data_to_datasource(
+            name=device,
+            data={"f": columns["f"], "T": columns["T"]},
+            timestamps=timestamps,
+            names_mapper={"f": "Frequency (digits)", "T": "Temperature (C)"},
+            units={"f": "digits", "T": "C"},
+        )
+
+        # Calculate water elevation
+        logger.info(f"Calculating water elevation for {device}")
+        timestamps, water_elevation = compute.compute_piezo_elevation(
+            timestamps=timestamps,
+            frequency=columns["f"],
+            temperature=columns["T"],
+            sensor_info=CALIBRATIONS.coefficients(device, timestamps),
+            columnar=True,
+        )
+
+        # Load water elevation to Eagle.io
+        logger.info(f"Loading water elevation to Eagle.io for {device}")
+        eagleio.load_data_to_datasource(
+            name=device,
+            data=water_elevation,
+            timestamps=timestamps,
+            names_mapper={"water_elevation": "Water Elevation (ft)"},
+            units={"water_elevation": "ft"},
+        )
+        store.record_upload(device, latest_date_i, rows=len(data))
+
+        summary["windows"] += 1
+        summary["rows"] += len(data)
+        summary["latest_date"] = latest_date_i
+
+    return summary
+
+
+def run_piezometers(
+    devices: list[str], start_dates: dict, eagleio, store, max_workers: int = 1
+) -> dict:
+    """
+    Runs `process_piezometer` for many devices, up to `max_workers` at a time.
 
-                # Load water elevation to Eagle.io
-                logger.info(f"Loading water elevation to Eagle.io")
-                eagleio.load_data_to_datasource(
-                    name=device,
-                    data=water_elevation,
-                    names_mapper={"water_elevation": "Water Elevation (ft)"},
-                    units={"water_elevation": "ft"},
-                )
+    Devices are independent: a device that fails is logged and reported in
+    the results, and does not stop the others. Progress already recorded in
+    the sync state store is kept, so the next run resumes where it stopped.
+
+    Returns:
+        dict: Device name -> summary. Each summary has the keys returned by
+            `process_piezometer` (when successful), plus `status` ("ok" or
+            "failed"), `error` and `elapsed` (seconds).
+    """
+
+    def run(device):
+        start = time.monotonic()
+        try:
+            result = process_piezometer(device, start_dates[device], eagleio, store)
+        except Exception as e:
+            logger.exception(f"Failed to process device: {device}")
+            result = {"status": "failed", "error": repr(e)}
+        else:
+            result.update(status="ok", error=None)
+        result["elapsed"] = time.monotonic() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = dict(zip(devices, executor.map(run, devices)))
+
+    for device, result in results.items():
+        if result["status"] == "ok":
+            logger.info(
+                f"{device}: {result['rows']} rows in {result['windows']} windows, "
+                f"up to {result['latest_date']} ({result['elapsed']:.1f} s)"
+            )
+        else:
+            logger.error(
+                f"{device}: failed after {result['elapsed']:.1f} s: {result['error']}"
+            )
+    return results
+
+
+def main(max_workers: int = PIEZOMETER_WORKERS):
+
+    eagleio = get_eagleio_workspace()
+    store = SyncStateStore(SYNC_STATE_PATH)
+    if max_workers is None:
+        max_workers = min(len(DEVICES), eagleio.controller.max_limit)
+
+    # Load Piezometer data from iTwin IoT #####################################
+    logger.info("Retrieving start dates")
+    start_dates = get_start_dates(list(DEVICES), eagleio, store)
+    results = run_piezometers(
+        list(DEVICES), start_dates, eagleio, store, max_workers=max_workers
+    )
 
     # Load NWPS data ##########################################################
     logger.info("Loading NWPS data")
@@ -242,10 +470,11 @@ def main():
     )
 
     logger.info("Loading NWPS manual data")
-    data = nwps.get_manual_data()
-    eagleio.load_data_to_datasource(
+    # Streamed without loading the file; compressed only if the uploads above
+    # were accepted compressed
+    eagleio.stream_data_to_datasource(
         name="River Elevation",
-        data=data,
+        data=nwps.iter_manual_data(),
         names_mapper={"water_elevation": "Water Elevation (ft)"},
         units={"water_elevation": "ft"},
     )
@@ -253,38 +482,58 @@ def main():
     # Load manual transducer data #############################################
     logger.info("Loading manual transducer data")
     # for device in ["LW-04", "LW-08", "LW-10", "LW-14", "LW-18", "LW-20", "Stilling Well"]:
-    for device in ["Stilling Well"]:
+    manual_devices = ["Stilling Well"]
+    start_dates = get_start_dates(manual_devices, eagleio, store)
+    for device in manual_devices:
         logger.info(f"Processing manual transducer data for: {device}")
-        logger.info("Retrieving latest timestamp from Eagle.io")
-        start_date = get_start_date_from_eagleio(device)
-        logger.info(f"Latest timestamp in Eagle.io for {device}: {start_date}")
+        start_date = start_dates[device]
+        logger.info(f"Start date for {device}: {start_date}")
 
         data = get_manual_transducer_data(device, start_date)
 
-        # Process data in batches of 5000 keys
-        batch_size = 5000
-        all_keys = list(data.keys())
-        for i in range(0, len(all_keys), batch_size):
-            batch_keys = all_keys[i : i + batch_size]
-            batch_data = {key: data[key] for key in batch_keys}
-            logger.info(
-                f"Processing batch {i//batch_size + 1} with {len(batch_keys)} records"
-            )
-            eagleio.load_data_to_datasource(
-                name=device,
-                data=batch_data,
-                names_mapper={
-                    "temperature": "Temperature (C)",
-                    "conductivity": "Conductivity (µS | cm)",
-                    "water_elevation": "Water Elevation (ft)",
-                },
-                units={
-                    "temperature": "C",
-                    "conductivity": "µS/cm",
-                    "water_elevation": "ft",
-                },
-            )
+        if not data:
+            logger.info(f"No new manual transducer data for: {device}")
+            continue
+
+        # Upload in chunks of 5000 rows, submitted concurrently
+        summary = eagleio.load_data_to_datasource(
+            name=device,
+            data=data,
+            names_mapper={
+                "temperature": "Temperature (C)",
+                "conductivity": "Conductivity (µS | cm)",
+                "water_elevation": "Water Elevation (ft)",
+            },
+            units={
+                "temperature": "C",
+                "conductivity": "µS/cm",
+                "water_elevation": "ft",
+            },
+            chunk_rows=5000,
+            max_workers=4,
+        )
+        logger.info(
+            f"Loaded {summary['rows']} records in {summary['chunks']} chunks "
+            f"({summary['bytes']} bytes, {summary['sent_bytes']} bytes sent)"
+        )
+        store.record_upload(
+            device, get_latest_date_from_data(data), rows=summary["rows"]
+        )
+
+    failed = [device for device, r in results.items() if r["status"] == "failed"]
+    if failed:
+        raise RuntimeError(f"Failed to process devices: {', '.join(failed)}")
 
 
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=PIEZOMETER_WORKERS,
+        help="Number of piezometers processed concurrently. Defaults to one "
+        "per device, up to the Eagle.io concurrency limit.",
+    )
+    args = arg_parser.parse_args()
+    setup_logging(log_level="INFO", log_directory="logs", app_name="bf-goodrich-piezos")
+    main(max_workers=args.workers)
@@ -1,14 +1,25 @@
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+import hashlib
 import json
 import logging
+import numpy as np
 import os
 import requests
+import threading
+import time
+
+from eagleio.ratelimit import AdaptiveConcurrencyController
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Shared by all calls to the iTwin platform so that concurrent callers back
+# off together when the API throttles.
+controller = AdaptiveConcurrencyController()
+
 
 def handle_request(response: requests.Response) -> dict:
     """
@@ -45,8 +56,13 @@ def handle_request(response: requests.Response) -> dict:
             raise Exception(f"API call error: {response.text}")
 
 
-def get_token() -> str:
-    """Retrieves an OAuth access token for the iTwin platform API."""
+def _request_token() -> dict:
+    """
+    Requests an OAuth access token for the iTwin platform API.
+
+    Returns:
+        dict: The token response, with `access_token` and `expires_in` keys.
+    """
     url = "https://ims.bentley.com/connect/token"
     payload = {
         "grant_type": "client_credentials",
@@ -54,8 +70,148 @@ def get_token() -> str:
         "client_secret": os.getenv("ITWIN_IOT_CLIENT_SECRET"),
         "scope": "itwin-platform",
     }
-    r = handle_request(requests.post(url, data=payload))
-    return r["access_token"]
+    return handle_request(controller.call(lambda: requests.post(url, data=payload)))
+
+
+def get_token() -> str:
+    """Retrieves an OAuth access token for the iTwin platform API."""
+    return _request_token()["access_token"]
+
+
+class TokenProvider:
+    """
+    Provides a valid iTwin platform access token, refreshing it shortly
+    before it expires.
+
+    The token is shared by all threads: when it needs refreshing, a single
+    request is sent while concurrent callers wait for its result. With a
+    `cache_dir`, the token is also stored on disk (readable by the owner
+    only) so that other processes reuse it until it expires.
+
+    .. example::
+        provider = TokenProvider(cache_dir=".cache")
+        headers = {"Authorization": f"Bearer {provider.get_token()}"}
+    """
+
+    def __init__(self, cache_dir: str = None, refresh_margin: float = 300):
+        """
+        Args:
+            cache_dir (str, optional): Directory for the on-disk token cache.
+                The token is only kept in memory when None.
+            refresh_margin (float): Number of seconds before expiry at which
+                the token is refreshed.
+        """
+        self.cache_dir = cache_dir
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        """Returns a token valid for at least `refresh_margin` seconds."""
+        with self._lock:
+            if not self._is_fresh(self._expires_at):
+                cached = self._read_cache()
+                if cached is not None and self._is_fresh(cached["expires_at"]):
+                    self._token, self._expires_at = (
+                        cached["access_token"],
+                        cached["expires_at"],
+                    )
+                else:
+                    self._refresh()
+            return self._token
+
+    def invalidate(self) -> None:
+        """
+        Discards the current token, e.g. after the API rejected it, so that the
+        next call to `get_token` requests a new one.
+        """
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            path = self._cache_path()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    def _is_fresh(self, expires_at: float) -> bool:
+        return time.time() < expires_at - self.refresh_margin
+
+    def _refresh(self) -> None:
+        requested_at = time.time()
+        response = _request_token()
+        self._token = response["access_token"]
+        self._expires_at = requested_at + float(response.get("expires_in", 3600))
+        logger.info("Retrieved a new iTwin access token")
+        self._write_cache()
+
+    def _cache_path(self) -> str:
+        """
+        Returns the path of the on-disk token cache, or None when disabled.
+        The file name is derived from a hash of the client ID.
+        """
+        if self.cache_dir is None:
+            return None
+        client_id = os.getenv("ITWIN_IOT_CLIENT_ID") or ""
+        key = hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"itwin_token_{key}.json")
+
+    def _read_cache(self) -> dict:
+        """
+        Returns the token stored on disk, or None if the cache is disabled,
+        missing or unreadable.
+        """
+        path = self._cache_path()
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                cache = json.load(f)
+            return {
+                "access_token": cache["access_token"],
+                "expires_at": float(cache["expires_at"]),
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_cache(self) -> None:
+        """Writes the token to the on-disk cache, if enabled."""
+        path = self._cache_path()
+        if path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"access_token": self._token, "expires_at": self._expires_at}, f)
+        os.replace(tmp_path, path)
+
+
+# Token provider used by all calls to the iTwin platform. Replace it, e.g.
+# with one that has a `cache_dir`, to change how tokens are obtained.
+token_provider = TokenProvider()
+
+
+def _send(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Sends an authenticated request to the iTwin platform API. A request
+    rejected with 401 is retried once with a new token.
+    """
+
+    def send():
+        headers = {
+            "Authorization": f"Bearer {token_provider.get_token()}",
+            "Accept": "application/vnd.bentley.itwin-platform.v1+json",
+        }
+        return controller.call(
+            lambda: requests.request(method, url, headers=headers, **kwargs)
+        )
+
+    response = send()
+    if response.status_code == 401:
+        logger.warning("iTwin access token rejected, requesting a new one")
+        token_provider.invalidate()
+        response = send()
+    return response
 
 
 def get_all_nodes() -> dict:
@@ -71,19 +227,14 @@ def get_all_nodes() -> dict:
     """
     params = {"iTwinId": os.getenv("ITWIN_IOT_ASSET_ID")}
 
-    headers = {
-        "Authorization": f"Bearer {os.getenv('ITWIN_IOT_API_TOKEN')}",
-        "Accept": "application/vnd.bentley.itwin-platform.v1+json",
-    }
-
     url = f"https://api.bentley.com/sensor-data/integrations/nodes"
 
-    return handle_request(requests.get(url, headers=headers, params=params))
+    return handle_request(_send("GET", url, params=params))
 
 
 def query_node_by_dates(
-    sensor_id: str, start_date: str = None, end_date: str = None
-) -> dict:
+    sensor_id: str, start_date: str = None, end_date: str = None, columnar: bool = False
+):
     """
     Retrieves sensor data from the iTwin platform API for the specified sensor ID
     and optional date range.
@@ -91,6 +242,8 @@ def query_node_by_dates(
         sensor_id (str): The ID of the sensor to query
         start_date (str, optional): The start date for the data query in ISO 8601 format
         end_date (str, optional): The end date for the data query in ISO 8601 format
+        columnar (bool): Return the data as arrays, see `observations_to_columns`,
+            instead of a dictionary keyed by timestamp
 
     .. note::
         Pagination does not seem to be supported by the API. While the docs
@@ -98,11 +251,43 @@ def query_node_by_dates(
         it does not appear to be implemented. The API returns all data for the
         specified sensor ID and date range in a single response.
     """
-    headers = {
-        "Authorization": f"Bearer {os.getenv('ITWIN_IOT_API_TOKEN')}",
-        "Accept": "application/vnd.bentley.itwin-platform.v1+json",
-    }
+    data, _ = _query_observations(sensor_id, start_date, end_date)
+    if data is None:
+        raise Exception("No data found for the given sensor ID and date range.")
+    return observations_to_columns(data) if columnar else data
+
+
+def observations_to_columns(data: dict, keys: list[str] = None) -> tuple:
+    """
+    Converts sensor data, as returned by `query_node_by_dates`, to arrays in a
+    single pass over the rows.
+
+    Args:
+        data (dict): Timestamp -> {unit key: value}, e.g.
+            `{"2025-02-05T17:00:00.000Z": {"f": 7711.34, "T": 17.30}, ...}`.
+        keys (list[str], optional): The unit keys to convert. Defaults to
+            every key found in any row, in order of first appearance.
+
+    Returns:
+        tuple: A `datetime64[ms]` array of the timestamps (UTC) and a dictionary
+            of float arrays per unit key, e.g. `{"f": ..., "T": ...}`. Missing
+            and null values are NaN.
+    """
+    if keys is None:
+        keys = list(dict.fromkeys(k for row in data.values() for k in row))
+    table = np.array(
+        [[row.get(k) for k in keys] for row in data.values()], dtype=float
+    ).reshape(len(data), len(keys))
+    # Timestamps are UTC; the "Z" suffix is dropped for NumPy
+    timestamps = np.array([ts.rstrip("Z") for ts in data], dtype="datetime64[ms]")
+    return timestamps, {k: table[:, i] for i, k in enumerate(keys)}
 
+
+def _query_observations(sensor_id: str, start_date: str, end_date: str) -> tuple:
+    """
+    Queries sensor data like `query_node_by_dates` and also returns the size
+    in bytes of the response body. The data is None when the range is empty.
+    """
     url = "https://api.bentley.com/sensor-data/data/observations"
 
     body = {
@@ -114,32 +299,161 @@ def query_node_by_dates(
             "T": "C",
         },
     }
-    response = handle_request(requests.post(url, headers=headers, json=body))
-    if "data" in response:
-        return response["data"]
-    else:
-        raise Exception("No data found for the given sensor ID and date range.")
+    raw = _send("POST", url, json=body)
+    response = handle_request(raw)
+    return response.get("data"), len(raw.content)
+
+
+class AdaptiveWindow:
+    """
+    Sizes the time span of successive iTwin IoT queries of a sensor.
+
+    The API has no pagination, so the span of a query is what bounds the
+    size of its response. After every query the observed data density (rows
+    per day) and response size (bytes per row) are used to size the next
+    span so that it returns about `target_rows` rows and stays under
+    `max_bytes`. Spans that return no data grow, so gaps and sparse sensors
+    are crossed in few requests.
+
+    .. example::
+        window = AdaptiveWindow(target_rows=10000)
+        for start, end, data in iter_windows(sensor_id, start_date, window):
+            ...
+    """
+
+    def __init__(
+        self,
+        initial_days: float = 30,
+        min_days: float = 1 / 24,
+        max_days: float = 365,
+        target_rows: int = 20000,
+        max_bytes: int = 20 * 2**20,
+        max_growth: float = 4,
+    ):
+        """
+        Args:
+            initial_days (float): Span of the first query, in days.
+            min_days (float): Lower bound of the span, in days.
+            max_days (float): Upper bound of the span, in days.
+            target_rows (int): Number of rows each query should return.
+            max_bytes (int): Response size each query should stay under.
+            max_growth (float): Maximum factor between consecutive spans, which
+                keeps a burst or a gap from swinging the span too far.
+        """
+        self.min_days = min_days
+        self.max_days = max_days
+        self.target_rows = target_rows
+        self.max_bytes = max_bytes
+        self.max_growth = max_growth
+        self.days = self._clamp(initial_days)
+
+    def _clamp(self, days: float) -> float:
+        return min(self.max_days, max(self.min_days, days))
+
+    def observe(self, days: float, rows: int, nbytes: int) -> None:
+        """
+        Updates the span of the next query from the result of the last one.
+
+        Args:
+            days (float): The span actually covered by the query, in days.
+            rows (int): The number of new rows returned.
+            nbytes (int): The size of the response body.
+        """
+        if rows == 0 or days <= 0:
+            self.days = self._clamp(self.days * self.max_growth)
+            return
+
+        target_rows = min(self.target_rows, self.max_bytes * rows / max(nbytes, 1))
+        days = target_rows / (rows / days)
+        # Shrink at once to stay under the ceiling, but grow gradually
+        self.days = self._clamp(min(self.days * self.max_growth, days))
+
+
+def _parse_date(date: str) -> datetime:
+    return datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%fZ").replace(
+        tzinfo=timezone.utc
+    )
+
+
+def _format_date(dt: datetime) -> str:
+    s = dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return s[:-4] + "Z"  # Milliseconds, to match API response
+
+
+def iter_windows(sensor_id: str, start_date: str, window: AdaptiveWindow = None):
+    """
+    Queries all the data of a sensor from `start_date` up to now, in
+    consecutive windows sized by `window`.
+
+    Each window starts at the latest timestamp returned by the previous one
+    (startDate is inclusive, so that row is returned again), or at the end of
+    the previous window when it had no newer data.
+
+    Yields:
+        tuple: `(start_date, end_date, data)` for every window that returned
+            data newer than its start date.
+    """
+    window = window or AdaptiveWindow()
+    start = _parse_date(start_date)
+    while True:
+        now = datetime.now(timezone.utc)
+        if start >= now:
+            return
+        end = start + timedelta(days=window.days)
+        start_date, end_date = _format_date(start), _format_date(end)
+        data, nbytes = _query_observations(sensor_id, start_date, end_date)
+        data = data or {}
+        new_rows = sum(1 for k in data if k != start_date)
+
+        covered = (min(end, now) - start) / timedelta(days=1)
+        window.observe(covered, new_rows, nbytes)
+        logger.debug(
+            f"Queried {sensor_id} from {start_date} to {end_date}: {new_rows} rows, "
+            f"{nbytes} bytes, next window {window.days:.2f} days"
+        )
+
+        if new_rows == 0:
+            if end >= now:
+                return
+            start = end
+            continue
+
+        yield start_date, end_date, data
+        start = _parse_date(_get_latest_date_from_data(data))
 
 
 def _get_latest_date_from_data(data: dict) -> str:
-    keys = list(data.keys())
-    dates = [datetime.strptime(key, "%Y-%m-%dT%H:%M:%S.%fZ") for key in keys]
-    s = max(dates).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    # Timestamps share a fixed-width ISO 8601 format, so the latest one is the
+    # largest string; only that one is parsed and formatted.
+    latest = datetime.strptime(max(data), "%Y-%m-%dT%H:%M:%S.%fZ")
+    s = latest.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
     return s.replace(".000000Z", ".000Z")  # Format to match API response
 
 
-def query_node(sensor_id: str) -> dict:
+def query_node(
+    sensor_id: str,
+    start_date: str = "2024-01-01T00:00:00.000Z",
+    end_date: str = None,
+    max_workers: int = None,
+    partition_days: float = 30,
+) -> dict:
     """
     Retrieves all the data for a specific sensor. Method recursively queries the API
     until all data is retrieved.
 
+    With `max_workers`, the range is instead split into sub-ranges of
+    `partition_days` that are fetched concurrently, see `query_nodes`.
+
     .. note::
         startDate is inclusive meaning that the data for the start date is included in the response.
         Recursion stops when the latest date in the response is equal to the latest date in the previous response.
     """
+    if max_workers is not None:
+        return query_nodes(
+            [sensor_id], start_date, end_date, max_workers, partition_days
+        )[sensor_id]
 
-    start_date = "2024-01-01T00:00:00.000Z"
-    end_date = "2030-01-01T00:00:00.000Z"
+    end_date = end_date or "2030-01-01T00:00:00.000Z"
 
     logger.info(f"Querying sensor: {sensor_id} for dates {start_date} to {end_date}")
     data = query_node_by_dates(sensor_id, start_date, end_date)
@@ -166,3 +480,90 @@ def query_node(sensor_id: str) -> dict:
             raise Exception("Too many iterations, check the API response")
 
     return data
+
+
+def _partition_range(start_date: str, end_date: str, days: float) -> list[tuple]:
+    """Splits a date range into consecutive `(start, end)` sub-ranges."""
+    start, end = _parse_date(start_date), _parse_date(end_date)
+    step = timedelta(days=days)
+    ranges = []
+    while start < end:
+        ranges.append((_format_date(start), _format_date(min(start + step, end))))
+        start += step
+    return ranges
+
+
+def _reaches_end(data: dict, end_date: str) -> bool:
+    """
+    Returns True if the latest reading of a response is within two sampling
+    intervals of `end_date`, i.e. the response covers its whole range. The
+    API does not flag truncated responses, so one that stops earlier may have
+    been truncated.
+    """
+    if len(data) < 2:
+        return False
+    times = np.array(sorted(ts.rstrip("Z") for ts in data), dtype="datetime64[ms]")
+    interval = np.median(np.diff(times).astype(np.int64))
+    gap = (np.datetime64(end_date.rstrip("Z"), "ms") - times[-1]).astype(np.int64)
+    return gap <= 2 * interval
+
+
+def _query_range(sensor_id: str, start_date: str, end_date: str) -> dict:
+    """
+    Retrieves all the data of a sensor within a range. When a response stops
+    short of the end of the range, it may have been truncated, so the range is
+    queried again from the latest returned timestamp until no newer data comes
+    back. A complete response costs a single request.
+    """
+    data = {}
+    while True:
+        data_i, _ = _query_observations(sensor_id, start_date, end_date)
+        if not data_i:
+            return data
+        data.update(data_i)
+        latest_date = _get_latest_date_from_data(data_i)
+        if latest_date <= start_date or _reaches_end(data_i, end_date):
+            return data
+        start_date = latest_date
+
+
+def query_nodes(
+    sensor_ids: list[str],
+    start_date: str = "2024-01-01T00:00:00.000Z",
+    end_date: str = None,
+    max_workers: int = 8,
+    partition_days: float = 30,
+) -> dict:
+    """
+    Retrieves all the data of several sensors over a range.
+
+    The range of every sensor is split into sub-ranges of `partition_days`
+    and all sub-ranges of all sensors are fetched concurrently. The results
+    are merged in chronological order; timestamps returned by two adjacent
+    sub-ranges (both ends of a range are inclusive) appear once.
+
+    Args:
+        sensor_ids (list[str]): The IDs of the sensors to query.
+        start_date (str): The start of the range, in ISO 8601 format.
+        end_date (str, optional): The end of the range. Defaults to now.
+        max_workers (int): Maximum number of concurrent requests.
+        partition_days (float): Length of the sub-ranges, in days.
+
+    Returns:
+        dict: Sensor ID -> data, in the format of `query_node_by_dates`. Sensors
+            without data in the range map to an empty dictionary.
+    """
+    end_date = end_date or _format_date(datetime.now(timezone.utc))
+    ranges = _partition_range(start_date, end_date, partition_days)
+    tasks = [(sensor_id, start, end) for sensor_id in sensor_ids for start, end in ranges]
+    logger.info(
+        f"Querying {len(sensor_ids)} sensors from {start_date} to {end_date} "
+        f"in {len(tasks)} requests"
+    )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = executor.map(lambda task: _query_range(*task), tasks)
+        merged = {sensor_id: {} for sensor_id in sensor_ids}
+        for (sensor_id, _, _), data in zip(tasks, results):
+            merged[sensor_id].update(data)
+    return merged
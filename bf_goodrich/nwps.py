@@ -40,7 +40,30 @@ def get_gauge_data():
     return data
 
 
-def get_manual_data():
+def iter_manual_data(path: str = None):
+    """
+    Yields the manual water elevation data one row at a time, as
+    `(timestamp, {"water_elevation": value})` pairs, without loading the whole
+    file into memory. See `get_manual_data`.
+
+    Args:
+        path (str, optional): The data file. Defaults to `data/river_elev.txt`.
+    """
+    p = path or os.path.join(
+        os.path.dirname(__file__),
+        "data",
+        "river_elev.txt",
+    )
+    with open(p, "r") as f:
+        next(f)  # Skip the header line
+        for line in f:
+            date, water_elevation, _ = line.strip().split(",")
+            date = date + ".000Z"
+            date = date.replace(" ", "T")
+            yield date, {"water_elevation": float(water_elevation)}
+
+
+def get_manual_data(path: str = None):
     """
     Retrieves manual water elevation data and transforms it into a dictionary
     with timestamps as keys and water elevation values as nested dictionaries:
@@ -54,19 +77,8 @@ def get_manual_data():
         },
         ...
     }
-    """
-    p = os.path.join(
-        os.path.dirname(__file__),
-        "data",
-        "river_elev.txt",
-    )
-    data = {}
-    with open(p, "r") as f:
-        lines = f.readlines()[1:]  # Skip the header line
-        for line in lines:
-            date, water_elevation, _ = line.strip().split(",")
-            date = date + ".000Z"
-            date = date.replace(" ", "T")
-            data[date] = {"water_elevation": float(water_elevation)}
 
-    return data
+    Args:
+        path (str, optional): The data file. Defaults to `data/river_elev.txt`.
+    """
+    return dict(iter_manual_data(path))
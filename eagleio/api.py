@@ -1,20 +1,131 @@
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from dateutil import parser
+import gzip
+import hashlib
+import itertools
+import json
+import numpy as np
+import os
+import pandas as pd
 import requests
+import threading
+import time
+
+from eagleio import jts
+from eagleio.dedup import UploadDeduplicator
+from eagleio.ratelimit import AdaptiveConcurrencyController
+from requests.adapters import HTTPAdapter
+
+DATASOURCE_CLASS = "io.eagle.models.node.source.data"
+PARAMETER_CLASS = "io.eagle.models.node.point"
+
+# Statuses with which the server, or a proxy in front of it, may reject a
+# gzip-compressed body: bad request, length required, payload too large and
+# unsupported media type
+GZIP_REJECTED_STATUS_CODES = (400, 411, 413, 415)
 
 
 class EagleIOWorkspace:
     """Represents a workspace in the Eagle.io API."""
 
-    def __init__(self, api_key):
+    def __init__(
+        self,
+        api_key,
+        pool_size: int = 10,
+        timeout: float = 30,
+        cache_dir: str = None,
+        cache_ttl: float = 3600,
+        base_url: str = "https://api.eagle.io/api/v1",
+        compress: bool = False,
+        controller: AdaptiveConcurrencyController = None,
+        deduplicator: UploadDeduplicator = None,
+    ):
         """
         Initializes the EagleIOWorkspace with the provided API key for that
         workspace.
+
+        All API calls made by the workspace share a single keep-alive session,
+        so connections to api.eagle.io are reused for the lifetime of the
+        instance. Use the workspace as a context manager, or call `close()`,
+        to release the pooled connections.
+
+        The node list of the workspace is loaded lazily the first time it is
+        needed. When `cache_dir` is given, the node list is also persisted to
+        a JSON file keyed by the API key and reused for `cache_ttl` seconds,
+        so new workspace instances start from a local file read instead of a
+        full workspace listing.
+
+        Args:
+            api_key (str): The Eagle.io API key of the workspace.
+            pool_size (int): Maximum number of pooled connections kept alive.
+            timeout (float): Timeout in seconds applied to every request.
+            cache_dir (str, optional): Directory for the on-disk node cache.
+                Disabled when None.
+            cache_ttl (float): Age in seconds after which the on-disk node
+                cache is considered stale.
+            base_url (str): Root URL of the Eagle.io API.
+            compress (bool): Send historic uploads gzip-compressed. If the
+                server rejects a compressed body, the upload is resent
+                uncompressed and compression is disabled for the workspace.
+                Streamed uploads are only compressed once a buffered upload
+                was accepted compressed.
+            controller (AdaptiveConcurrencyController, optional): Controller
+                bounding the requests in flight and retrying throttled
+                requests. Pass the same controller to several workspaces to
+                share the provider's rate limit. A new one is created when
+                None.
+            deduplicator (UploadDeduplicator, optional): Index of the rows
+                already uploaded. When given, uploads skip rows that were
+                already sent to the datasource with the same values.
+
+        .. example::
+            with EagleIOWorkspace(api_key) as eagleio:
+                eagleio.load_data_to_datasource(...)
         """
         self.api_key = api_key
-        self._base_url = "https://api.eagle.io/api/v1"
+        self._base_url = base_url
         self.headers = {"X-Api-Key": self.api_key}
-        self._nodes = self.get_nodes()
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self._nodes = None
+        self._nodes_lock = threading.Lock()
+        self.compress = compress
+        # Set once the server accepted a compressed buffered upload
+        self._gzip_confirmed = False
+        if controller is None:
+            controller = AdaptiveConcurrencyController(max_limit=pool_size)
+        self.controller = controller
+        self.deduplicator = deduplicator
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        """Closes the underlying HTTP session and its pooled connections."""
+        self._session.close()
+
+    def _request(
+        self, method: str, url: str, retry: bool = True, **kwargs
+    ) -> requests.Response:
+        """
+        Sends a request through the pooled session using the workspace timeout.
+        The request goes through the workspace's concurrency controller, which
+        retries throttled requests unless `retry` is False.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.controller.call(
+            lambda: self._session.request(method, url, **kwargs), retry=retry
+        )
 
     def get_nodes(self) -> dict:
         """
@@ -25,28 +136,152 @@ class EagleIOWorkspace:
             "attr": "_id,_class,name,workspaceId,parentId",
         }
 
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._request("GET", url, params=params)
 
         if response.status_code == 200:
             return response.json()
         else:
             response.raise_for_status()
 
+    @property
+    def nodes(self) -> list[dict]:
+        """The cached node list of the workspace, loaded on first access."""
+        self._ensure_nodes()
+        return self._nodes
+
+    def _ensure_nodes(self) -> None:
+        """
+        Loads the node list on first use, from the on-disk cache when it is
+        fresh or from the API otherwise.
+        """
+        if self._nodes is not None:
+            return
+        with self._nodes_lock:
+            if self._nodes is not None:
+                return
+            nodes = self._read_node_cache()
+            if nodes is None:
+                nodes = self.get_nodes()
+                self._write_node_cache(nodes)
+            self._set_nodes(nodes)
+
+    def refresh_nodes(self) -> None:
+        """
+        Downloads the node list of the workspace and rebuilds the in-memory
+        indexes used to resolve datasources and parameters. The on-disk cache,
+        if enabled, is rewritten.
+
+        Call this method after nodes are added, renamed or removed in Eagle.io
+        so that lookups see the changes.
+        """
+        nodes = self.get_nodes()
+        with self._nodes_lock:
+            self._write_node_cache(nodes)
+            self._set_nodes(nodes)
+
+    def invalidate_node_cache(self) -> None:
+        """
+        Discards the cached node list, both in memory and on disk. The next
+        lookup downloads the node list again.
+        """
+        with self._nodes_lock:
+            self._nodes = None
+            path = self._node_cache_path()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+    def _node_cache_path(self) -> str:
+        """
+        Returns the path of the on-disk node cache, or None when disabled. The
+        file name is derived from a hash of the API key so that the key itself
+        is never written to disk.
+        """
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"eagleio_nodes_{key}.json")
+
+    def _read_node_cache(self) -> list[dict]:
+        """
+        Returns the node list stored on disk, or None if the cache is
+        disabled, missing, unreadable or older than `cache_ttl`.
+        """
+        path = self._node_cache_path()
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - cache.get("fetched_at", 0) > self.cache_ttl:
+            return None
+        return cache.get("nodes")
+
+    def _write_node_cache(self, nodes: list[dict]) -> None:
+        """Writes the node list to the on-disk cache, if enabled."""
+        path = self._node_cache_path()
+        if path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": time.time(), "nodes": nodes}, f)
+        os.replace(tmp_path, path)
+
+    def _set_nodes(self, nodes: list[dict]) -> None:
+        # Indexes are built before the node list is published so that other
+        # threads never see a loaded node list with stale indexes.
+        self._build_indexes(nodes)
+        self._nodes = nodes
+
+    def _build_indexes(self, nodes: list[dict]) -> None:
+        """
+        Builds hash indexes over the node list:
+
+        - `_nodes_by_id`: node ID -> node
+        - `_children_by_parent`: parent ID -> list of child node IDs
+        - `_datasource_ids_by_name`: datasource name -> list of datasource IDs
+        """
+        nodes_by_id = {}
+        children_by_parent = {}
+        datasource_ids_by_name = {}
+        for node in nodes:
+            nodes_by_id[node["_id"]] = node
+            if "parentId" in node:
+                children_by_parent.setdefault(node["parentId"], []).append(
+                    node["_id"]
+                )
+            if node.get("_class", "").startswith(DATASOURCE_CLASS):
+                datasource_ids_by_name.setdefault(node.get("name"), []).append(
+                    node["_id"]
+                )
+        self._nodes_by_id = nodes_by_id
+        self._children_by_parent = children_by_parent
+        self._datasource_ids_by_name = datasource_ids_by_name
+
+    def get_children_ids(self, parent_id: str) -> list[str]:
+        """
+        Returns the IDs of the child nodes of a node from the cached node list.
+        """
+        self._ensure_nodes()
+        return list(self._children_by_parent.get(parent_id, []))
+
     def get_node_by_id(self, node_id: str) -> dict:
         """
         Fetch a specific node by ID from the Eagle.io API.
         """
         url = f"{self._base_url}/nodes/{node_id}"
-        response = requests.get(url, headers=self.headers)
+        response = self._request("GET", url)
 
         if response.status_code == 200:
             return response.json()
         else:
             response.raise_for_status()
 
-    def get_datasource_id_by_name(self, name: str) -> dict:
+    def get_datasource_id_by_name(self, name: str) -> str:
         """
-        Fetch a specific datasource by name from the Eagle.io API.
+        Fetch a specific datasource by name from the cached node list.
         Raises ValueError if no datasource is found or if multiple datasources
         are found with the same name.
 
@@ -54,30 +289,24 @@ class EagleIOWorkspace:
             This function assumes that the datasource name is unique within the
             workspace.
 
-            To retrieve a datasource we pass a filter to the API that
-            matches the class to `io.eagle.models.node.source.data`. We could
-            be more specific by using the class `io.eagle.models.node.source.data.Jts`,
-            but this would not work for other types of datasources that might
-            be added in the future.
-        """
-        url = f"{self._base_url}/nodes/"
-        params = {
-            "filter": f"name($eq:{name}),_class($match:io.eagle.models.node.source.data)"
-        }
-        response = requests.get(url, headers=self.headers, params=params)
+            Datasources are the nodes whose class starts with
+            `io.eagle.models.node.source.data`. We could be more specific by
+            using the class `io.eagle.models.node.source.data.Jts`, but this
+            would not work for other types of datasources that might be added
+            in the future.
 
-        if response.status_code == 200:
-            r = response.json()
-            if len(r) == 0:
-                raise ValueError(f"No datasource found with name: {name}")
-            elif len(r) > 1:
-                ids = [item["_id"] for item in r]
-                raise ValueError(
-                    f"Multiple datasources found with name: {name}. IDs: {ids}"
-                )
-            return r[0]["_id"]
-        else:
-            response.raise_for_status()
+            The lookup does not query the API. Call `refresh_nodes()` to pick
+            up datasources created after the node list was downloaded.
+        """
+        self._ensure_nodes()
+        ids = self._datasource_ids_by_name.get(name, [])
+        if len(ids) == 0:
+            raise ValueError(f"No datasource found with name: {name}")
+        elif len(ids) > 1:
+            raise ValueError(
+                f"Multiple datasources found with name: {name}. IDs: {ids}"
+            )
+        return ids[0]
 
     @staticmethod
     def _ts_object_data_to_jts(data: dict, names_mapper: dict, units: dict) -> dict:
@@ -127,23 +356,7 @@ class EagleIOWorkspace:
         ), "Data must be a dictionary of dictionaries"
 
         # Header columns
-        columns = {}
-        for i, k in enumerate(attrs):
-            try:
-                n = names_mapper[k]
-            except KeyError:
-                raise KeyError(
-                    f"Column name '{k}' not found in names_mapper. Available keys: {list(names_mapper.keys())}"
-                )
-
-            try:
-                u = units[k]
-            except KeyError:
-                raise KeyError(
-                    f"Column name '{k}' not found in units. Available keys: {list(units.keys())}"
-                )
-
-            columns[i] = {"name": n, "dataType": "NUMBER", "units": u}
+        columns = jts.build_header_columns(attrs, names_mapper, units)
 
         # Data manipulation - Regardless of the order of attributes, we need to
         # ensure that the data is in the correct format for JTS.
@@ -164,20 +377,59 @@ class EagleIOWorkspace:
         return jts_template
 
     def load_data_to_datasource(
-        self, name: str, data: dict, names_mapper: dict, units: dict
-    ) -> None:
+        self,
+        name: str,
+        data,
+        names_mapper: dict,
+        units: dict,
+        timestamps=None,
+        chunk_rows: int = None,
+        chunk_bytes: int = None,
+        max_workers: int = 1,
+        retries: int = 2,
+    ) -> dict:
         """
         Loads numeric data to a specific datasource in the Eagle.io API.
 
         The Eagle.io API expects the data to be in JSON Time Series (JTS) format.
+        Data is accepted in one of three layouts:
+
+        - object-based: a dict keyed by timestamp with a dict of values per
+          timestamp (see example below)
+        - columnar: a dict of column arrays (lists or NumPy arrays) together
+          with a `timestamps` array
+        - a pandas DataFrame indexed by timestamp, one column per parameter
+
+        Columnar data is encoded with vectorized operations, so its conversion
+        cost scales with the array size rather than with the number of cells.
+
+        Large uploads can be split into chunks by row count (`chunk_rows`)
+        and/or serialized size (`chunk_bytes`). Chunks are submitted
+        concurrently by up to `max_workers` threads. Chunks that fail are then
+        retried one at a time, in chronological order, up to `retries` times
+        each.
 
         Args:
             name (str): The datasource name to which the data will be loaded.
-            data (dict): The data to be loaded into the datasource. Data must be
-                time-series data structured as a nested JSON object. See example
-                below.
+            data (dict | pd.DataFrame): The data to be loaded into the
+                datasource. See above.
             names_mapper (dict): Mapping of column names to storage names.
             units (dict): Mapping of column names to units.
+            timestamps (optional): Timestamps of columnar data, as JTS
+                strings or datetimes. Required when `data` is a dict of
+                column arrays.
+            chunk_rows (int, optional): Maximum number of rows per request.
+            chunk_bytes (int, optional): Maximum size in bytes of each request
+                body.
+            max_workers (int): Number of chunks submitted concurrently.
+            retries (int): Number of retries for each failed chunk.
+
+        Returns:
+            dict: Upload summary with the number of `rows` and `chunks` sent,
+                the size of the JTS documents in `bytes`, the number of bytes
+                actually sent in `sent_bytes`, which is smaller when
+                compression is enabled, and the number of `skipped_rows`
+                already uploaded before.
 
         .. example::
             data = {
@@ -188,53 +440,574 @@ class EagleIOWorkspace:
             names_mapper = {"f": "Frequency", "T": "Temperature"} # Names to be used in Eagle.io
             units = {"f": "digits", "T": "C"} # Units to be used in Eagle.io
 
+            # Equivalent columnar data
+            timestamps = np.array(["2025-02-05T17:00", "2025-02-05T18:00", "2025-02-05T19:00"], dtype="datetime64[ms]")
+            data = {"f": np.array([1000, 1500, 1800]), "T": np.array([16, 17, 18])}
+
         Raises:
-            ValueError: If the datasource is not found or if the API request fails.
+            ValueError: If the datasource is not found or if the API request
+                fails after all retries.
         """
+        timestamps, columns = self._to_columns(data, timestamps)
         datasource_id = self.get_datasource_id_by_name(name)
-        jts = self._ts_object_data_to_jts(data, names_mapper, units)
+        header = jts.encode_header(list(columns), names_mapper, units)
+
+        skipped_rows = 0
+        if self.deduplicator is not None:
+            timestamps = jts.format_timestamps(timestamps)
+            columns = {k: np.asarray(v) for k, v in columns.items()}
+            mask, digests = self.deduplicator.filter(
+                datasource_id, timestamps, columns
+            )
+            skipped_rows = int((~mask).sum())
+            timestamps = timestamps[mask]
+            columns = {k: v[mask] for k, v in columns.items()}
+            digests = digests[mask]
+
+        if len(timestamps) == 0:
+            return {
+                "rows": 0,
+                "chunks": 0,
+                "bytes": 0,
+                "sent_bytes": 0,
+                "skipped_rows": skipped_rows,
+            }
+
+        rows = jts.encode_rows(timestamps, columns)
+        chunks = jts.split_rows(rows, chunk_rows, chunk_bytes, header)
+        bodies = [jts.build_document(header, chunk) for chunk in chunks]
+
+        sent_bytes = [None] * len(bodies)
+
+        def submit(i):
+            try:
+                sent_bytes[i] = self._put_historic(datasource_id, bodies[i])
+            except (ValueError, requests.RequestException) as e:
+                return e
+
+        if max_workers > 1 and len(bodies) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                errors = list(executor.map(submit, range(len(bodies))))
+        else:
+            errors = [submit(i) for i in range(len(bodies))]
+
+        for i, error in enumerate(errors):
+            attempt = 0
+            while error is not None:
+                if attempt >= retries:
+                    raise ValueError(
+                        f"Failed to load chunk {i + 1} of {len(bodies)} to datasource: {error}"
+                    ) from error
+                attempt += 1
+                error = submit(i)
+
+        if self.deduplicator is not None:
+            self.deduplicator.record(datasource_id, columns, timestamps, digests)
+
+        return {
+            "rows": len(rows),
+            "chunks": len(bodies),
+            "bytes": sum(len(body) for body in bodies),
+            "sent_bytes": sum(sent_bytes),
+            "skipped_rows": skipped_rows,
+        }
+
+    def _put_historic(self, datasource_id: str, body: bytes) -> int:
+        """
+        Sends an encoded JTS document to the historic endpoint of a datasource
+        and returns the number of body bytes sent.
+
+        When compression is enabled the body is sent gzip-compressed. If the
+        server rejects it with one of `GZIP_REJECTED_STATUS_CODES` and then
+        accepts the uncompressed body, compression is disabled for the rest of
+        the workspace's life.
+        """
         url = f"{self._base_url}/nodes/{datasource_id}/historic"
-        response = requests.put(url, headers=self.headers, json=jts)
+        headers = {"Content-Type": "application/json"}
+
+        if self.compress:
+            compressed = gzip.compress(body, compresslevel=6)
+            response = self._request(
+                "PUT",
+                url,
+                data=compressed,
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+            if response.status_code == 202:
+                self._gzip_confirmed = True
+                return len(compressed)
+            if response.status_code not in GZIP_REJECTED_STATUS_CODES:
+                raise ValueError(f"Failed to load data to datasource: {response.text}")
+
+        response = self._request("PUT", url, data=body, headers=headers)
 
         if response.status_code != 202:
             raise ValueError(f"Failed to load data to datasource: {response.text}")
+        if self.compress:
+            self.compress = False
+        return len(body)
+
+    def stream_data_to_datasource(
+        self,
+        name: str,
+        data,
+        names_mapper: dict,
+        units: dict,
+        batch_rows: int = 1000,
+    ) -> dict:
+        """
+        Streams numeric data to a specific datasource in the Eagle.io API
+        without building the JTS document in memory.
+
+        Rows are consumed from `data` in batches of `batch_rows`, encoded and
+        sent as a chunked request body, so the peak memory stays flat
+        regardless of how many rows are uploaded. Columns are taken from the
+        first row.
+
+        Unlike `load_data_to_datasource`, a streamed upload is consumed as it
+        is sent and therefore can be neither retried nor resent uncompressed.
+        To avoid a compressed body being rejected, the body is only
+        gzip-compressed when compression is enabled and a buffered upload of
+        the workspace was already accepted compressed; otherwise it is sent
+        uncompressed. A failed upload raises, and the caller must stream the
+        data again. When the workspace has a deduplicator, the rows sent are
+        only recorded once the upload is confirmed, so streaming again only
+        sends the rows that were not stored.
+
+        Args:
+            name (str): The datasource name to which the data will be loaded.
+            data: Iterable of `(timestamp, {column: value})` rows, e.g. a
+                generator or `dict.items()`.
+            names_mapper (dict): Mapping of column names to storage names.
+            units (dict): Mapping of column names to units.
+            batch_rows (int): Number of rows encoded at a time.
+
+        Returns:
+            dict: Upload summary with the number of `rows`, the size of the
+                JTS document in `bytes`, the number of bytes actually sent in
+                `sent_bytes` and the number of `skipped_rows` already uploaded
+                before.
 
-    def get_latest_timestamp_from_datasource_by_name(self, name: str) -> str:
+        .. example::
+            def read_rows(path):
+                with open(path) as f:
+                    for line in f:
+                        ts, value = line.strip().split(",")
+                        yield ts, {"water_elevation": float(value)}
+
+            eagleio.stream_data_to_datasource(
+                "River Elevation",
+                read_rows("river_elev.csv"),
+                names_mapper={"water_elevation": "Water Elevation (ft)"},
+                units={"water_elevation": "ft"},
+            )
+
+        Raises:
+            ValueError: If there is no data, the datasource is not found or
+                the API request fails.
+        """
+        rows = iter(data)
+        try:
+            first = next(rows)
+        except StopIteration:
+            raise ValueError("No data to load to datasource")
+        attrs = list(first[1].keys())
+        chunks = jts.iter_object_rows_as_columns(
+            itertools.chain([first], rows), attrs, batch_rows
+        )
+        return self.stream_chunks_to_datasource(name, chunks, names_mapper, units)
+
+    def stream_chunks_to_datasource(
+        self, name: str, chunks, names_mapper: dict, units: dict
+    ) -> dict:
+        """
+        Streams columnar data to a specific datasource in the Eagle.io API,
+        one chunk at a time. See `stream_data_to_datasource`.
+
+        Args:
+            name (str): The datasource name to which the data will be loaded.
+            chunks: Iterable of `(timestamps, columns)` pairs, where `columns`
+                maps column names to arrays as long as `timestamps`. Columns
+                are taken from the first chunk.
+            names_mapper (dict): Mapping of column names to storage names.
+            units (dict): Mapping of column names to units.
+
+        Returns:
+            dict: Upload summary, see `stream_data_to_datasource`.
+
+        Raises:
+            ValueError: If there is no data, the datasource is not found or
+                the API request fails.
+        """
+        chunks = iter(chunks)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            raise ValueError("No data to load to datasource")
+        attrs = list(first[1].keys())
+        datasource_id = self.get_datasource_id_by_name(name)
+        header = jts.encode_header(attrs, names_mapper, units)
+
+        summary = {"rows": 0, "bytes": 0, "sent_bytes": 0, "skipped_rows": 0}
+        sent = []
+
+        def filter_chunks(chunks):
+            for timestamps, columns in chunks:
+                if self.deduplicator is not None:
+                    timestamps = jts.format_timestamps(timestamps)
+                    columns = {k: np.asarray(v) for k, v in columns.items()}
+                    mask, digests = self.deduplicator.filter(
+                        datasource_id, timestamps, columns
+                    )
+                    summary["skipped_rows"] += int((~mask).sum())
+                    timestamps = timestamps[mask]
+                    columns = {k: v[mask] for k, v in columns.items()}
+                    sent.append((timestamps, digests[mask]))
+                summary["rows"] += len(timestamps)
+                if len(timestamps) > 0:
+                    yield timestamps, columns
+
+        def count_bytes(chunks, key):
+            for chunk in chunks:
+                summary[key] += len(chunk)
+                yield chunk
+
+        chunks = filter_chunks(itertools.chain([first], chunks))
+        # Nothing is sent when every row was already uploaded
+        try:
+            first_chunk = next(chunks)
+        except StopIteration:
+            return summary
+        chunks = itertools.chain([first_chunk], chunks)
+
+        body = count_bytes(jts.iter_document(header, chunks), "bytes")
+        headers = {"Content-Type": "application/json"}
+        if self.compress and self._gzip_confirmed:
+            body = jts.iter_gzip(body)
+            headers["Content-Encoding"] = "gzip"
+        body = count_bytes(body, "sent_bytes")
+
+        url = f"{self._base_url}/nodes/{datasource_id}/historic"
+        response = self._request(
+            "PUT", url, retry=False, data=body, headers=headers
+        )
+
+        if response.status_code != 202:
+            raise ValueError(f"Failed to load data to datasource: {response.text}")
+
+        for timestamps, digests in sent:
+            self.deduplicator.record(datasource_id, attrs, timestamps, digests)
+        return summary
+
+    @staticmethod
+    def _to_columns(data, timestamps=None) -> tuple:
+        """
+        Normalizes the data layouts accepted by `load_data_to_datasource` to a
+        timestamps array and a dictionary of column arrays.
+        """
+        if isinstance(data, pd.DataFrame):
+            return jts.dataframe_to_columns(data)
+        if timestamps is not None:
+            return timestamps, data
+        return jts.object_data_to_columns(data)
+
+    def get_historic_data(
+        self,
+        node_ids,
+        start_time,
+        end_time,
+        slice_days: float = 30,
+        max_workers: int = 4,
+    ) -> pd.DataFrame:
+        """
+        Downloads the historic values of one or many parameter nodes over a
+        time range.
+
+        The range is split into slices of `slice_days` days that are fetched
+        concurrently from `/nodes/{id}/historic`. Timestamps and values of
+        each response are parsed straight into arrays and assembled into a
+        single DataFrame.
+
+        Args:
+            node_ids (str | list[str]): The parameter node ID(s).
+            start_time (str | datetime): Start of the range, as an ISO 8601
+                string or datetime. Naive datetimes are assumed to be in UTC.
+            end_time (str | datetime): End of the range.
+            slice_days (float): Length in days of each request's time slice.
+            max_workers (int): Number of slices fetched concurrently.
+
+        Returns:
+            pd.DataFrame: One column per node ID, indexed by UTC timestamp.
+                Missing values are NaN.
+
+        .. example::
+            df = eagleio.get_historic_data(
+                eagleio.get_children_ids(eagleio.get_datasource_id_by_name("LW-02S")),
+                "2024-01-01T00:00:00.000Z",
+                "2025-01-01T00:00:00.000Z",
+            )
+        """
+        if isinstance(node_ids, str):
+            node_ids = [node_ids]
+        tasks = self._get_historic_tasks(node_ids, start_time, end_time, slice_days)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(lambda task: self._get_historic_arrays(*task), tasks)
+            )
+        return self._historic_arrays_to_dataframe(node_ids, results)
+
+    def _get_historic_tasks(
+        self, node_ids: list[str], start_time, end_time, slice_days: float
+    ) -> list[tuple]:
+        """
+        Splits a historic download into `(node_id, start, end)` requests, one
+        per node and time slice, ordered by node then time.
+        """
+        start = self._to_utc(start_time)
+        end = self._to_utc(end_time)
+
+        slices = []
+        slice_start = start
+        while slice_start < end:
+            slice_end = min(end, slice_start + timedelta(days=slice_days))
+            slices.append((slice_start, slice_end))
+            slice_start = slice_end
+        return [(node_id, *s) for node_id in node_ids for s in slices]
+
+    @staticmethod
+    def _historic_arrays_to_dataframe(
+        node_ids: list[str], results: list[tuple]
+    ) -> pd.DataFrame:
+        """
+        Assembles the arrays returned for the requests of `_get_historic_tasks`
+        into a DataFrame with one column per node.
+        """
+        n_slices = len(results) // len(node_ids)
+        series = []
+        for i, node_id in enumerate(node_ids):
+            node_results = results[i * n_slices : (i + 1) * n_slices]
+            timestamps = np.concatenate(
+                [ts for ts, _ in node_results]
+                or [np.array([], dtype="datetime64[ms]")]
+            )
+            values = np.concatenate([v for _, v in node_results] or [np.array([])])
+            s = pd.Series(values, index=pd.DatetimeIndex(timestamps), name=node_id)
+            # Slice boundaries may be returned by both adjacent slices
+            series.append(s[~s.index.duplicated(keep="first")])
+
+        df = pd.concat(series, axis=1).sort_index()
+        df.index = df.index.tz_localize("UTC")
+        df.index.name = "timestamp"
+        return df
+
+    def _get_historic_arrays(
+        self, node_id: str, start: datetime, end: datetime
+    ) -> tuple:
+        """
+        Fetches the historic values of a parameter node between `start` and
+        `end` and returns them as a datetime64 array and a float array.
+        """
+        url = f"{self._base_url}/nodes/{node_id}/historic"
+        params = {
+            "startTime": self._format_timestamp(start),
+            "endTime": self._format_timestamp(end),
+        }
+        response = self._request("GET", url, params=params)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to query historic data: {response.text}")
+
+        data = response.json()["data"]
+        timestamps = np.array(
+            [d["ts"][:-1] if d["ts"].endswith("Z") else d["ts"] for d in data],
+            dtype="datetime64[ms]",
+        )
+        values = np.array(
+            [d["f"]["0"].get("v") if "0" in d["f"] else None for d in data],
+            dtype=float,
+        )
+        return timestamps, values
+
+    @staticmethod
+    def _to_utc(value) -> datetime:
+        """Converts an ISO 8601 string or datetime to a naive UTC datetime."""
+        if isinstance(value, str):
+            value = parser.isoparse(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def get_watermarks(self, names: list[str] = None) -> dict:
+        """
+        Retrieves the latest timestamp of many datasources with a single API
+        request.
+
+        Instead of probing the history of every parameter, the `/nodes/`
+        listing is asked for the `currentTime` attribute (the timestamp of the
+        latest value) of all parameter nodes. The watermark of a datasource is
+        the earliest `currentTime` of its parameters, i.e. the point up to
+        which every parameter has data, consistent with
+        `get_latest_timestamp_from_datasource_by_name`.
+
+        Args:
+            names (list[str], optional): The datasource names. All datasources
+                of the workspace when None.
+
+        Returns:
+            dict: Datasource name -> latest timestamp. The value is None for
+                datasources that are not found, have no parameters or have a
+                parameter without data.
+        """
+        self._ensure_nodes()
+        if names is None:
+            names = list(self._datasource_ids_by_name)
+
+        url = f"{self._base_url}/nodes/"
+        params = {
+            "attr": "_id,parentId,currentTime",
+            "filter": f"_class($match:{PARAMETER_CLASS})",
+        }
+        response = self._request("GET", url, params=params)
+        if response.status_code != 200:
+            response.raise_for_status()
+        current_times = {
+            node["_id"]: node.get("currentTime") for node in response.json()
+        }
+
+        watermarks = {}
+        for name in names:
+            try:
+                children_ids = self._get_datasource_children_ids(name)
+            except ValueError:
+                watermarks[name] = None
+                continue
+            times = [current_times.get(child_id) for child_id in children_ids]
+            if any(t is None for t in times):
+                watermarks[name] = None
+            else:
+                latest = min(parser.isoparse(t) for t in times)
+                watermarks[name] = self._format_timestamp(latest)
+        return watermarks
+
+    def get_latest_timestamp_from_datasource_by_name(
+        self, name: str, max_workers: int = 1
+    ) -> str:
         """
         Retrieves the latest timestamp(s) from all parameters of a datasource identified by its name.
 
+        Args:
+            name (str): The datasource name.
+            max_workers (int): Number of parameters probed concurrently. The
+                default probes them one after another.
+
         Note:
             - A datasource is a node with the class 'io.eagle.models.node.source.data.Jts'.
             - Each parameter is a child node of the datasource.
             - The method first retrieves the datasource ID by name, then finds all child nodes
               associated with that datasource ID.
         """
-        end_date = datetime.now() + timedelta(days=1)
-        end_date = end_date.strftime("%Y-%m-%d") + "T00:00:00.000Z"
-        datasource_id = self.get_datasource_id_by_name(name)
+        end_date = self._get_probe_end_date()
+        children_ids = self._get_datasource_children_ids(name)
+
+        if max_workers > 1 and len(children_ids) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                latest_dates = list(
+                    executor.map(
+                        lambda child_id: self._get_latest_date_from_node(
+                            child_id, end_date
+                        ),
+                        children_ids,
+                    )
+                )
+        else:
+            latest_dates = [
+                self._get_latest_date_from_node(child_id, end_date)
+                for child_id in children_ids
+            ]
 
-        children_ids = []
-        for node in self._nodes:
-            if "parentId" in node and node["parentId"] == datasource_id:
-                children_ids.append(node["_id"])
+        return self._format_timestamp(min(latest_dates))
 
+    def get_latest_timestamps_from_datasources_by_name(
+        self, names: list[str], max_workers: int = 8
+    ) -> dict:
+        """
+        Retrieves the latest timestamp of many datasources at once. The
+        parameters of all datasources are probed concurrently through a single
+        bounded thread pool.
+
+        Args:
+            names (list[str]): The datasource names.
+            max_workers (int): Maximum number of concurrent probes.
+
+        Returns:
+            dict: Datasource name -> latest timestamp, as returned by
+                `get_latest_timestamp_from_datasource_by_name`. The value is
+                None for datasources that are not found, have no parameters or
+                have no data.
+        """
+        end_date = self._get_probe_end_date()
+        results = {}
+        probes = {}
+        for name in names:
+            try:
+                probes[name] = self._get_datasource_children_ids(name)
+            except ValueError:
+                results[name] = None
+
+        def probe(child_id):
+            try:
+                return self._get_latest_date_from_node(child_id, end_date)
+            except ValueError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: [executor.submit(probe, child_id) for child_id in children]
+                for name, children in probes.items()
+            }
+            for name, name_futures in futures.items():
+                latest_dates = [f.result() for f in name_futures]
+                if any(d is None for d in latest_dates):
+                    results[name] = None
+                else:
+                    results[name] = self._format_timestamp(min(latest_dates))
+
+        return {name: results[name] for name in names}
+
+    def _get_datasource_children_ids(self, name: str) -> list[str]:
+        """
+        Returns the parameter node IDs of a datasource. Raises ValueError if
+        the datasource does not exist or has no parameters.
+        """
+        datasource_id = self.get_datasource_id_by_name(name)
+        children_ids = self.get_children_ids(datasource_id)
         if not children_ids:
             raise ValueError(f"No child nodes found for datasource: {name}")
+        return children_ids
 
-        latest_dates = []
-        for child_id in children_ids:
-            url = f"{self._base_url}/nodes/{child_id}/historic"
-            params = {"limit": "25", "endTime": end_date}
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code != 200:
-                raise ValueError(f"Failed to query datasource by name: {response.text}")
-
-            dates = [d["ts"] for d in response.json()["data"]]
-            dates = [parser.parse(d) for d in dates]
-            latest_dates.append(max(dates))
-
-        return (
-            min(latest_dates)
-            .strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            .replace("000000Z", "000Z")
-        )
+    def _get_latest_date_from_node(self, node_id: str, end_date: str) -> datetime:
+        """
+        Returns the latest timestamp of a parameter node before `end_date`,
+        based on its last 25 historic values.
+        """
+        url = f"{self._base_url}/nodes/{node_id}/historic"
+        params = {"limit": "25", "endTime": end_date}
+        response = self._request("GET", url, params=params)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to query datasource by name: {response.text}")
+
+        data = response.json()["data"]
+        if not data:
+            raise ValueError(f"No historic data found for node: {node_id}")
+        return max(parser.isoparse(d["ts"]) for d in data)
+
+    @staticmethod
+    def _get_probe_end_date() -> str:
+        """Returns the end of the window used to probe latest timestamps."""
+        end_date = datetime.now() + timedelta(days=1)
+        return end_date.strftime("%Y-%m-%d") + "T00:00:00.000Z"
+
+    @staticmethod
+    def _format_timestamp(dt: datetime) -> str:
+        # JTS timestamps have millisecond precision: `2025-02-05T17:00:00.123Z`
+        return f"{dt.strftime('%Y-%m-%dT%H:%M:%S')}.{dt.microsecond // 1000:03d}Z"
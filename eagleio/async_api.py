@@ -0,0 +1,222 @@
+import asyncio
+
+import pandas as pd
+
+from eagleio.api import EagleIOWorkspace
+from eagleio.dedup import UploadDeduplicator
+from eagleio.ratelimit import AdaptiveConcurrencyController
+
+
+class AsyncEagleIOWorkspace:
+    """
+    Asyncio counterpart of `EagleIOWorkspace`.
+
+    Every operation is awaitable and runs the blocking HTTP call of the
+    underlying `EagleIOWorkspace` in a worker thread, so the event loop is
+    never blocked. All calls share the connection pool of that workspace and
+    are bounded by a semaphore, which lets one process drive uploads for many
+    datasources concurrently without exceeding `max_concurrency` in-flight
+    requests.
+
+    .. example::
+        async with AsyncEagleIOWorkspace(api_key, max_concurrency=8) as eagleio:
+            await asyncio.gather(
+                *[eagleio.load_data_to_datasource(n, d, mapper, units) for n, d in ...]
+            )
+    """
+
+    def __init__(
+        self,
+        api_key,
+        max_concurrency: int = 10,
+        timeout: float = 30,
+        cache_dir: str = None,
+        cache_ttl: float = 3600,
+        base_url: str = "https://api.eagle.io/api/v1",
+        compress: bool = False,
+        controller: AdaptiveConcurrencyController = None,
+        deduplicator: UploadDeduplicator = None,
+    ):
+        """
+        Initializes the AsyncEagleIOWorkspace with the provided API key for
+        that workspace.
+
+        Args:
+            api_key (str): The Eagle.io API key of the workspace.
+            max_concurrency (int): Maximum number of requests in flight. The
+                connection pool is sized to match.
+            timeout (float): Timeout in seconds applied to every request.
+            cache_dir (str, optional): Directory for the on-disk node cache.
+            cache_ttl (float): Age in seconds after which the on-disk node
+                cache is considered stale.
+            base_url (str): Root URL of the Eagle.io API.
+            compress (bool): Send historic uploads gzip-compressed.
+            controller (AdaptiveConcurrencyController, optional): Controller
+                bounding and retrying the requests, see `EagleIOWorkspace`.
+            deduplicator (UploadDeduplicator, optional): Index of the rows
+                already uploaded, see `EagleIOWorkspace`.
+        """
+        self.workspace = EagleIOWorkspace(
+            api_key,
+            pool_size=max_concurrency,
+            timeout=timeout,
+            cache_dir=cache_dir,
+            cache_ttl=cache_ttl,
+            base_url=base_url,
+            compress=compress,
+            controller=controller,
+            deduplicator=deduplicator,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Closes the underlying HTTP session and its pooled connections."""
+        await asyncio.to_thread(self.workspace.close)
+
+    async def _run(self, func, *args, **kwargs):
+        """Runs a blocking workspace call in a thread, bounded by the semaphore."""
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def _ensure_nodes(self) -> None:
+        # The node list is downloaded in a worker thread once; afterwards
+        # lookups only read the in-memory indexes and run on the event loop.
+        if self.workspace._nodes is None:
+            await self._run(self.workspace._ensure_nodes)
+
+    async def get_nodes(self) -> list[dict]:
+        """
+        Fetch all nodes and a reduced set of attributes from the Eagle.io API.
+        """
+        return await self._run(self.workspace.get_nodes)
+
+    async def refresh_nodes(self) -> None:
+        """See `EagleIOWorkspace.refresh_nodes`."""
+        await self._run(self.workspace.refresh_nodes)
+
+    async def get_node_by_id(self, node_id: str) -> dict:
+        """
+        Fetch a specific node by ID from the Eagle.io API.
+        """
+        return await self._run(self.workspace.get_node_by_id, node_id)
+
+    async def get_datasource_id_by_name(self, name: str) -> str:
+        """See `EagleIOWorkspace.get_datasource_id_by_name`."""
+        await self._ensure_nodes()
+        return self.workspace.get_datasource_id_by_name(name)
+
+    async def load_data_to_datasource(
+        self, name: str, data: dict, names_mapper: dict, units: dict, **kwargs
+    ):
+        """
+        See `EagleIOWorkspace.load_data_to_datasource`. Keyword arguments are
+        passed through.
+        """
+        await self._ensure_nodes()
+        return await self._run(
+            self.workspace.load_data_to_datasource,
+            name,
+            data,
+            names_mapper,
+            units,
+            **kwargs,
+        )
+
+    async def stream_data_to_datasource(
+        self, name: str, data, names_mapper: dict, units: dict, **kwargs
+    ) -> dict:
+        """
+        See `EagleIOWorkspace.stream_data_to_datasource`. The rows are consumed
+        in a worker thread. Keyword arguments are passed through.
+        """
+        await self._ensure_nodes()
+        return await self._run(
+            self.workspace.stream_data_to_datasource,
+            name,
+            data,
+            names_mapper,
+            units,
+            **kwargs,
+        )
+
+    async def stream_chunks_to_datasource(
+        self, name: str, chunks, names_mapper: dict, units: dict
+    ) -> dict:
+        """
+        See `EagleIOWorkspace.stream_chunks_to_datasource`. The chunks are
+        consumed in a worker thread.
+        """
+        await self._ensure_nodes()
+        return await self._run(
+            self.workspace.stream_chunks_to_datasource,
+            name,
+            chunks,
+            names_mapper,
+            units,
+        )
+
+    async def get_historic_data(
+        self, node_ids, start_time, end_time, slice_days: float = 30
+    ) -> pd.DataFrame:
+        """
+        Downloads the historic values of one or many parameter nodes over a
+        time range, fetching the time slices concurrently. See
+        `EagleIOWorkspace.get_historic_data`.
+        """
+        if isinstance(node_ids, str):
+            node_ids = [node_ids]
+        tasks = self.workspace._get_historic_tasks(
+            node_ids, start_time, end_time, slice_days
+        )
+        results = await asyncio.gather(
+            *[self._run(self.workspace._get_historic_arrays, *task) for task in tasks]
+        )
+        return self.workspace._historic_arrays_to_dataframe(node_ids, results)
+
+    async def get_latest_timestamp_from_datasource_by_name(self, name: str) -> str:
+        """
+        Retrieves the latest timestamp from all parameters of a datasource
+        identified by its name. The parameters are probed concurrently. See
+        `EagleIOWorkspace.get_latest_timestamp_from_datasource_by_name`.
+        """
+        await self._ensure_nodes()
+        end_date = self.workspace._get_probe_end_date()
+        children_ids = self.workspace._get_datasource_children_ids(name)
+        latest_dates = await asyncio.gather(
+            *[
+                self._run(self.workspace._get_latest_date_from_node, child_id, end_date)
+                for child_id in children_ids
+            ]
+        )
+        return self.workspace._format_timestamp(min(latest_dates))
+
+    async def get_watermarks(self, names: list[str] = None) -> dict:
+        """See `EagleIOWorkspace.get_watermarks`."""
+        await self._ensure_nodes()
+        return await self._run(self.workspace.get_watermarks, names)
+
+    async def get_latest_timestamps_from_datasources_by_name(
+        self, names: list[str]
+    ) -> dict:
+        """
+        Retrieves the latest timestamp of many datasources concurrently.
+
+        Returns:
+            dict: Datasource name -> latest timestamp, or None for datasources
+                that are not found, have no parameters or have no data.
+        """
+
+        async def probe(name):
+            try:
+                return await self.get_latest_timestamp_from_datasource_by_name(name)
+            except ValueError:
+                return None
+
+        results = await asyncio.gather(*[probe(name) for name in names])
+        return dict(zip(names, results))
@@ -0,0 +1,181 @@
+"""
+This module provides a deduplication layer for uploads to Eagle.io.
+
+It keeps, per datasource, a compact SQLite index of the rows already sent:
+the row timestamp and a 64-bit hash of the row values. Rows whose timestamp
+was already sent with the same values are dropped before serialization, so
+re-fetching overlapping windows or re-reading the same files does not cost
+any upload volume.
+"""
+
+from contextlib import closing
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+
+from eagleio import jts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sent_rows (
+    datasource TEXT NOT NULL,
+    stream INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    digest INTEGER NOT NULL,
+    PRIMARY KEY (datasource, stream, ts)
+) WITHOUT ROWID
+"""
+
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def row_digests(columns: dict) -> np.ndarray:
+    """
+    Returns a 64-bit hash of the values of every row, computed column by
+    column with vectorized integer arithmetic.
+
+    Args:
+        columns (dict): Column name -> array of numeric values.
+
+    Returns:
+        np.ndarray: int64 array with one digest per row.
+    """
+    digests = None
+    for values in columns.values():
+        arr = np.asarray(values, dtype=np.float64)
+        # All NaNs hash alike, whatever their bit pattern
+        arr = np.where(np.isnan(arr), np.nan, arr)
+        bits = arr.view(np.uint64)
+        if digests is None:
+            digests = np.zeros(len(bits), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            digests = (digests ^ bits) * _MULTIPLIER
+            digests ^= digests >> np.uint64(29)
+    if digests is None:
+        return np.zeros(0, dtype=np.int64)
+    return digests.view(np.int64)
+
+
+def stream_id(column_names) -> int:
+    """
+    Returns a signed 64-bit identifier of a set of columns. Uploads of
+    different columns to the same datasource (e.g. raw readings and computed
+    values) are indexed separately.
+    """
+    key = "\x1f".join(sorted(column_names)).encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class UploadDeduplicator:
+    """
+    Index of the rows already uploaded to each datasource.
+
+    .. example::
+        dedup = UploadDeduplicator("sent_rows.sqlite")
+        mask, digests = dedup.filter(datasource_id, timestamps, columns)
+        ...  # upload the rows where mask is True
+        dedup.record(datasource_id, columns, timestamps[mask], digests[mask])
+
+        # Eagle.io only stored rows up to `watermark`
+        dedup.forget(datasource_id, watermark)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the SQLite database file. It is created, along
+                with its directory, if it does not exist.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def filter(self, datasource: str, timestamps, columns: dict) -> tuple:
+        """
+        Finds the rows that were not already uploaded with the same values.
+
+        Args:
+            datasource (str): The datasource identifier.
+            timestamps: Row timestamps, as strings or datetimes (see
+                `jts.format_timestamps`).
+            columns (dict): Column name -> array of numeric values.
+
+        Returns:
+            tuple: A boolean mask of the rows to upload and the digests of all
+                rows, to be passed to `record` once the upload is confirmed.
+        """
+        ts = jts.format_timestamps(timestamps).tolist()
+        digests = row_digests(columns)
+        if len(ts) == 0:
+            return np.zeros(0, dtype=bool), digests
+
+        with closing(self._connect()) as conn:
+            sent = dict(
+                conn.execute(
+                    """
+                    SELECT ts, digest FROM sent_rows
+                    WHERE datasource = ? AND stream = ? AND ts BETWEEN ? AND ?
+                    """,
+                    (datasource, stream_id(columns), min(ts), max(ts)),
+                )
+            )
+        if not sent:
+            return np.ones(len(ts), dtype=bool), digests
+
+        mask = np.array(
+            [sent.get(t) != d for t, d in zip(ts, digests.tolist())], dtype=bool
+        )
+        return mask, digests
+
+    def record(self, datasource: str, column_names, timestamps, digests) -> None:
+        """
+        Records rows as uploaded, in a single transaction.
+
+        Args:
+            datasource (str): The datasource identifier.
+            column_names: The names of the uploaded columns.
+            timestamps: Timestamps of the uploaded rows.
+            digests: Digests of the uploaded rows, as returned by `filter`.
+        """
+        ts = jts.format_timestamps(timestamps).tolist()
+        stream = stream_id(column_names)
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sent_rows VALUES (?, ?, ?, ?)",
+                zip(
+                    [datasource] * len(ts),
+                    [stream] * len(ts),
+                    ts,
+                    np.asarray(digests).tolist(),
+                ),
+            )
+
+    def forget(self, datasource: str, after) -> int:
+        """
+        Forgets the rows of a datasource newer than a timestamp, in every
+        column set, so that they are uploaded again. Use it when Eagle.io
+        turns out not to have stored rows whose upload was accepted.
+
+        Args:
+            datasource (str): The datasource identifier.
+            after: The timestamp after which rows are forgotten, as a string
+                or a datetime (see `jts.format_timestamps`).
+
+        Returns:
+            int: The number of rows forgotten.
+        """
+        ts = jts.format_timestamps([after])[0]
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "DELETE FROM sent_rows WHERE datasource = ? AND ts > ?",
+                (datasource, str(ts)),
+            )
+        return cursor.rowcount
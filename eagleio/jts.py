@@ -0,0 +1,295 @@
+"""
+This module encodes columnar time-series data as JSON Time Series (JTS)
+documents for the Eagle.io API.
+
+The encoder works on whole columns: timestamps are formatted and values are
+converted to their JSON representation with vectorized NumPy operations, and
+each row is then rendered with a single string template. No intermediate
+per-cell dictionaries are created.
+"""
+
+from datetime import datetime
+from itertools import islice
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def build_header_columns(attrs: list, names_mapper: dict, units: dict) -> dict:
+    """
+    Builds the JTS header columns for the given attributes.
+
+    Args:
+        attrs (list): The column names, in the order they appear in each row.
+        names_mapper (dict): Mapping of column names to storage names.
+        units (dict): Mapping of column names to units.
+
+    Returns:
+        dict: Column index -> {"name": ..., "dataType": "NUMBER", "units": ...}
+    """
+    columns = {}
+    for i, k in enumerate(attrs):
+        try:
+            n = names_mapper[k]
+        except KeyError:
+            raise KeyError(
+                f"Column name '{k}' not found in names_mapper. Available keys: {list(names_mapper.keys())}"
+            )
+
+        try:
+            u = units[k]
+        except KeyError:
+            raise KeyError(
+                f"Column name '{k}' not found in units. Available keys: {list(units.keys())}"
+            )
+
+        columns[i] = {"name": n, "dataType": "NUMBER", "units": u}
+    return columns
+
+
+def format_timestamps(timestamps) -> np.ndarray:
+    """
+    Formats timestamps as JTS timestamp strings (`2025-02-05T17:00:00.000Z`).
+
+    Strings are returned unchanged. Datetimes, given as arrays, pandas
+    DatetimeIndex and Series, or sequences of `datetime`/`pd.Timestamp`
+    objects, are converted to UTC and formatted in a single vectorized call;
+    naive datetimes are assumed to be in UTC.
+
+    Raises:
+        TypeError: If the timestamps are neither strings nor datetimes.
+    """
+    if isinstance(timestamps, (pd.DatetimeIndex, pd.Series)) or (
+        isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == "M"
+    ):
+        return _format_datetimes(pd.DatetimeIndex(timestamps))
+
+    if isinstance(timestamps, np.ndarray):
+        arr = timestamps
+    else:
+        # Object dtype keeps the type of every element, e.g. of mixed lists
+        arr = np.asarray(list(timestamps), dtype=object)
+    if arr.size == 0:
+        return np.array([], dtype=str)
+    if arr.dtype.kind == "U":
+        return arr
+    if arr.dtype.kind == "M":
+        return _format_datetimes(pd.DatetimeIndex(arr))
+    if arr.dtype.kind == "O":
+        values = arr.ravel().tolist()
+        if all(isinstance(v, str) for v in values):
+            return arr.astype(str)
+        if all(isinstance(v, (datetime, np.datetime64)) for v in values):
+            return _format_datetimes(pd.to_datetime(values, utc=True))
+    raise TypeError(
+        f"Timestamps must be strings or datetimes, got an array of {arr.dtype}"
+    )
+
+
+def _format_datetimes(dt: pd.DatetimeIndex) -> np.ndarray:
+    if dt.tz is not None:
+        dt = dt.tz_convert("UTC").tz_localize(None)
+    strs = np.datetime_as_string(dt.values.astype("datetime64[ms]"), unit="ms")
+    return np.char.add(strs, "Z")
+
+
+def format_values(values) -> np.ndarray:
+    """
+    Converts a column of numeric values to their JSON representation. Integer
+    columns keep their integer form; NaN and infinite values, which are not
+    valid JSON, become `null`.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return arr.astype(str)
+    arr = arr.astype(float)
+    strs = arr.astype(str)
+    finite = np.isfinite(arr)
+    if not finite.all():
+        strs = strs.astype(object)
+        strs[~finite] = "null"
+    return strs
+
+
+def dataframe_to_columns(df: pd.DataFrame) -> tuple:
+    """
+    Splits a DataFrame indexed by timestamp into a timestamps array and a
+    dictionary of column arrays.
+    """
+    columns = {c: df[c].to_numpy() for c in df.columns}
+    return df.index, columns
+
+
+def object_data_to_columns(data: dict) -> tuple:
+    """
+    Converts object-based timeseries data (see
+    `EagleIOWorkspace._ts_object_data_to_jts`) to a list of timestamps and a
+    dictionary of column lists. Attributes are taken from the first entry;
+    empty data gives no timestamps and no columns.
+    """
+    assert isinstance(data, dict), "Data must be a dictionary"
+    if not data:
+        return [], {}
+    first_key = next(iter(data))
+    assert isinstance(data[first_key], dict), "Data must be a dictionary of dictionaries"
+    attrs = list(data[first_key].keys())
+    rows = data.values()
+    columns = {a: [row[a] for row in rows] for a in attrs}
+    return list(data.keys()), columns
+
+
+def encode_rows(timestamps, columns: dict) -> list[str]:
+    """
+    Encodes columnar data as a list of JTS row strings, one per timestamp.
+
+    Args:
+        timestamps: Timestamps, as strings or datetimes (see
+            `format_timestamps`).
+        columns (dict): Column name -> array of values. The column order
+            defines the JTS field indexes.
+
+    Returns:
+        list[str]: Rows such as `{"ts":"...","f":{"0":{"v":1.0}}}`.
+    """
+    ts = format_timestamps(timestamps)
+    values = [format_values(v) for v in columns.values()]
+    for name, v in zip(columns, values):
+        if len(v) != len(ts):
+            raise ValueError(
+                f"Column '{name}' has {len(v)} values but there are {len(ts)} timestamps"
+            )
+
+    fields = ",".join(f'"{i}":{{"v":%s}}' for i in range(len(values)))
+    template = '{"ts":"%s","f":{' + fields + "}}"
+    return [template % row for row in zip(ts.tolist(), *[v.tolist() for v in values])]
+
+
+def encode_header(attrs: list, names_mapper: dict, units: dict) -> str:
+    """Returns the JSON encoded JTS header for the given attributes."""
+    columns = build_header_columns(attrs, names_mapper, units)
+    return json.dumps({"columns": columns}, separators=(",", ":"))
+
+
+def split_rows(
+    rows: list[str], max_rows: int = None, max_bytes: int = None, header: str = ""
+) -> list[list[str]]:
+    """
+    Splits encoded rows into consecutive chunks so that each JTS document
+    built from a chunk has at most `max_rows` rows and, when possible, at most
+    `max_bytes` bytes. A row larger than the byte budget on its own gets its
+    own chunk.
+
+    Args:
+        rows (list[str]): Encoded rows, see `encode_rows`.
+        max_rows (int, optional): Maximum number of rows per chunk.
+        max_bytes (int, optional): Maximum serialized size of each document.
+        header (str): The encoded header, counted towards the byte budget.
+    """
+    if max_rows is None and max_bytes is None:
+        return [rows]
+
+    # Size of a document without rows; rows are ASCII and add a comma each
+    overhead = len(build_document(header, []))
+    chunks = []
+    chunk = []
+    size = overhead
+    for row in rows:
+        row_size = len(row) + 1
+        full_rows = max_rows is not None and len(chunk) >= max_rows
+        full_bytes = max_bytes is not None and size + row_size > max_bytes
+        if chunk and (full_rows or full_bytes):
+            chunks.append(chunk)
+            chunk = []
+            size = overhead
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def build_document(header: str, rows: list[str]) -> bytes:
+    """Assembles a JTS document from an encoded header and encoded rows."""
+    doc = (
+        '{"docType":"jts","version":"1.0","header":'
+        + header
+        + ',"data":['
+        + ",".join(rows)
+        + "]}"
+    )
+    return doc.encode("utf-8")
+
+
+def iter_object_rows_as_columns(rows, attrs: list, batch_rows: int = 1000):
+    """
+    Groups an iterator of `(timestamp, {column: value})` rows into batches of
+    at most `batch_rows` rows, yielded as `(timestamps, columns)` pairs.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            return
+        timestamps = [ts for ts, _ in batch]
+        columns = {a: [values[a] for _, values in batch] for a in attrs}
+        yield timestamps, columns
+
+
+def iter_document(header: str, chunks):
+    """
+    Yields a JTS document as a sequence of byte strings, encoding one chunk of
+    columnar data at a time. Only one chunk is held in memory, so the peak
+    memory does not depend on the size of the document.
+
+    Args:
+        header (str): The encoded header, see `encode_header`.
+        chunks: Iterable of `(timestamps, columns)` pairs, see `encode_rows`.
+    """
+    yield b'{"docType":"jts","version":"1.0","header":' + header.encode("utf-8")
+    yield b',"data":['
+    separator = ""
+    for timestamps, columns in chunks:
+        rows = encode_rows(timestamps, columns)
+        if not rows:
+            continue
+        yield (separator + ",".join(rows)).encode("utf-8")
+        separator = ","
+    yield b"]}"
+
+
+def iter_gzip(chunks):
+    """Compresses a sequence of byte strings into a gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def columns_to_jts(timestamps, columns: dict, names_mapper: dict, units: dict) -> bytes:
+    """
+    Converts columnar timeseries data to an encoded JTS document.
+
+    Args:
+        timestamps: Timestamps, as strings or datetimes (see
+            `format_timestamps`).
+        columns (dict): Column name -> array of numeric values.
+        names_mapper (dict): Mapping of column names to storage names.
+        units (dict): Mapping of column names to units.
+
+    Returns:
+        bytes: The UTF-8 encoded JTS document.
+
+    .. example::
+        jts = columns_to_jts(
+            np.array(["2025-02-05T17:00:00", "2025-02-05T18:00:00"], dtype="datetime64[ms]"),
+            {"f": np.array([1000.0, 1500.0]), "T": np.array([16.0, 17.0])},
+            {"f": "Frequency", "T": "Temperature"},
+            {"f": "Hz", "T": "C"},
+        )
+    """
+    header = encode_header(list(columns), names_mapper, units)
+    return build_document(header, encode_rows(timestamps, columns))
@@ -0,0 +1,183 @@
+"""
+This module provides an adaptive concurrency controller for HTTP APIs that
+throttle their clients.
+
+The controller limits the number of requests in flight and adjusts that
+limit AIMD-style (additive increase, multiplicative decrease): every
+successful response slowly raises the limit, while throttled (HTTP 429/503)
+or slow responses cut it. Throttled requests are retried after the delay
+requested by the server's `Retry-After` header, or after a jittered
+exponential backoff when the header is missing. While a `Retry-After` delay
+is pending no new request is started, so all threads sharing the controller
+back off together.
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class AdaptiveConcurrencyController:
+    """Bounds and adapts the number of concurrent requests to an API."""
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60,
+        target_latency: float = None,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            initial_limit (int): Number of requests allowed in flight at start.
+            min_limit (int): Lower bound of the in-flight limit.
+            max_limit (int): Upper bound of the in-flight limit.
+            max_retries (int): Number of retries of a throttled request before
+                its response is returned to the caller.
+            backoff_base (float): Base delay in seconds of the exponential
+                backoff used when the server gives no `Retry-After`.
+            backoff_max (float): Maximum delay in seconds between retries.
+            target_latency (float, optional): Response time in seconds above
+                which the limit is reduced as if the request was throttled.
+                Latency is ignored when None.
+            decrease_factor (float): Factor applied to the limit on throttling.
+        """
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.throttled = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def call(
+        self, send: Callable[[], requests.Response], retry: bool = True
+    ) -> requests.Response:
+        """
+        Sends a request through the controller.
+
+        Args:
+            send (Callable): Function that sends the request and returns the
+                response. It is called again for every retry.
+            retry (bool): Whether throttled requests are retried. Disable it
+                for requests that cannot be sent twice, e.g. streamed bodies.
+
+        Returns:
+            requests.Response: The first response that is not throttled, or
+                the last throttled response once retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            self._acquire()
+            start = time.monotonic()
+            try:
+                response = send()
+            finally:
+                self._release()
+            latency = time.monotonic() - start
+
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                self._on_success(latency)
+                return response
+
+            delay = self._get_retry_delay(response, attempt)
+            self._on_throttled(delay)
+            if not retry or attempt >= self.max_retries:
+                return response
+
+            logger.warning(
+                f"Request throttled with status {response.status_code}, "
+                f"retrying in {delay:.1f} s (limit {int(self.limit)})"
+            )
+            attempt += 1
+            time.sleep(delay)
+
+    def _acquire(self) -> None:
+        with self._condition:
+            while True:
+                wait = self._blocked_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def _release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        if self.target_latency is not None and latency > self.target_latency:
+            self._decrease()
+            return
+        with self._condition:
+            # Additive increase: one extra slot per `limit` successful requests
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def _on_throttled(self, delay: float) -> None:
+        with self._condition:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self._decrease()
+
+    def _decrease(self) -> None:
+        with self._condition:
+            # Requests that were already in flight when the limit was cut
+            # report the same congestion; cut at most once per second.
+            now = time.monotonic()
+            if now - self._last_decrease < 1:
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+    def _get_retry_delay(self, response: requests.Response, attempt: int) -> float:
+        """
+        Returns the delay before retrying a throttled request: the server's
+        `Retry-After` when present, otherwise a jittered exponential backoff.
+        """
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        backoff = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, backoff)
+
+
+def parse_retry_after(value: str) -> float:
+    """
+    Parses a `Retry-After` header, given either in seconds or as an HTTP date,
+    into a delay in seconds. Returns None if the value is missing or invalid.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,157 @@
+"""
+This module provides a local, SQLite-backed store of the synchronization
+state of ETL sources.
+
+For every source the store records the last timestamp successfully uploaded
+to Eagle.io, the number of rows and uploads, and when the state was last
+reconciled with Eagle.io. ETL runs can then resume from local state without
+any remote lookup and only reconcile with Eagle.io occasionally.
+"""
+
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    datasource TEXT,
+    last_timestamp TEXT,
+    rows INTEGER NOT NULL DEFAULT 0,
+    uploads INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT,
+    reconciled_at TEXT
+)
+"""
+
+
+class SyncStateStore:
+    """
+    Persistent per-source high-water marks.
+
+    Timestamps are stored as JTS timestamp strings
+    (`2025-02-05T17:00:00.000Z`), which sort chronologically. Every method
+    opens its own short-lived connection and runs in a single transaction,
+    so the store can be shared by threads and processes.
+
+    .. example::
+        store = SyncStateStore("sync_state.sqlite")
+        start = store.get_last_timestamp("LW-02S")
+        ...
+        eagleio.load_data_to_datasource("LW-02S", data, names_mapper, units)
+        store.record_upload("LW-02S", latest_timestamp, rows=len(data))
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the SQLite database file. It is created, along
+                with its directory, if it does not exist.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def get(self, source: str) -> dict:
+        """
+        Returns the state of a source, or None if the source is unknown.
+
+        Returns:
+            dict: With keys `source`, `datasource`, `last_timestamp`, `rows`,
+                `uploads`, `updated_at` and `reconciled_at`.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM sync_state WHERE source = ?", (source,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_last_timestamp(self, source: str) -> str:
+        """
+        Returns the last uploaded timestamp of a source, or None if unknown.
+        """
+        state = self.get(source)
+        return state["last_timestamp"] if state is not None else None
+
+    def record_upload(
+        self, source: str, last_timestamp: str, rows: int, datasource: str = None
+    ) -> None:
+        """
+        Records a confirmed upload. The high-water mark only moves forward, so
+        re-uploading older data does not rewind it.
+
+        Args:
+            source (str): The ETL source name.
+            last_timestamp (str): The latest timestamp included in the upload.
+            rows (int): The number of rows uploaded.
+            datasource (str, optional): The Eagle.io datasource name, when it
+                differs from the source name.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO sync_state
+                    (source, datasource, last_timestamp, rows, uploads, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    datasource = COALESCE(excluded.datasource, datasource),
+                    last_timestamp = CASE
+                        WHEN last_timestamp IS NULL
+                            OR excluded.last_timestamp > last_timestamp
+                        THEN excluded.last_timestamp
+                        ELSE last_timestamp
+                    END,
+                    rows = rows + excluded.rows,
+                    uploads = uploads + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (source, datasource, last_timestamp, rows, self._now()),
+            )
+
+    def reconcile(self, source: str, last_timestamp: str) -> None:
+        """
+        Overwrites the high-water mark of a source with the value found in
+        Eagle.io, which is authoritative, and marks the source as reconciled.
+        """
+        now = self._now()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO sync_state
+                    (source, last_timestamp, updated_at, reconciled_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(source) DO UPDATE SET
+                    last_timestamp = excluded.last_timestamp,
+                    updated_at = excluded.updated_at,
+                    reconciled_at = excluded.reconciled_at
+                """,
+                (source, last_timestamp, now, now),
+            )
+
+    def needs_reconcile(self, source: str, max_age: timedelta) -> bool:
+        """
+        Returns True if the source is unknown, has no high-water mark or was
+        last reconciled with Eagle.io more than `max_age` ago.
+        """
+        state = self.get(source)
+        if state is None or state["last_timestamp"] is None:
+            return True
+        if state["reconciled_at"] is None:
+            return True
+        reconciled_at = datetime.strptime(
+            state["reconciled_at"], "%Y-%m-%dT%H:%M:%S.%fZ"
+        ).replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - reconciled_at > max_age
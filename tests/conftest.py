@@ -0,0 +1,135 @@
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+STUB_NODES = [
+    {
+        "_id": "ds1",
+        "_class": "io.eagle.models.node.source.data.Jts",
+        "name": "LW-02S",
+    },
+    {
+        "_id": "p1",
+        "_class": "io.eagle.models.node.point.NumberPoint",
+        "parentId": "ds1",
+    },
+    {
+        "_id": "p2",
+        "_class": "io.eagle.models.node.point.NumberPoint",
+        "parentId": "ds1",
+    },
+]
+
+STUB_HISTORIC = {
+    "p1": {"2025-02-05T17:00:00.000Z": 1.5, "2025-02-05T19:00:00.000Z": 2.5},
+    "p2": {"2025-02-05T17:00:00.000Z": 10, "2025-02-05T18:00:00.000Z": 20},
+}
+
+
+class StubEagleIOHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for the Eagle.io nodes and historic endpoints.
+
+    Accepted uploads are appended to `uploads` as `(path, jts)` pairs.
+    Compressed bodies are rejected with `gzip_status` unless `accept_gzip`,
+    and the next `fail_puts` uploads are rejected with 500.
+    """
+
+    uploads = []
+    accept_gzip = True
+    gzip_status = 415
+    fail_puts = 0
+    lock = threading.Lock()
+
+    def _send_json(self, status: int, body) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        attr = query.get("attr", [""])[0]
+        if url.path == "/api/v1/nodes/" and "currentTime" in attr:
+            points = [
+                {"_id": node_id, "currentTime": max(values)}
+                for node_id, values in STUB_HISTORIC.items()
+            ]
+            self._send_json(200, points)
+        elif url.path == "/api/v1/nodes/":
+            self._send_json(200, STUB_NODES)
+        elif url.path.endswith("/historic"):
+            node_id = url.path.split("/")[-2]
+            start = query.get("startTime", [""])[0]
+            end = query.get("endTime", ["9999"])[0]
+            data = [
+                {"ts": ts, "f": {"0": {"v": v}}}
+                for ts, v in STUB_HISTORIC[node_id].items()
+                if start <= ts <= end
+            ]
+            self._send_json(200, {"docType": "jts", "data": data})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding") != "chunked":
+            return self.rfile.read(int(self.headers["Content-Length"]))
+        body = b""
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return body
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def do_PUT(self):
+        body = self._read_body()
+        with self.lock:
+            fail = self.fail_puts > 0
+            if fail:
+                type(self).fail_puts -= 1
+        if fail:
+            self._send_json(500, {"error": "internal error"})
+            return
+        if self.headers.get("Content-Encoding") == "gzip":
+            if not self.accept_gzip:
+                self._send_json(self.gzip_status, {"error": "unsupported encoding"})
+                return
+            body = gzip.decompress(body)
+        with self.lock:
+            self.uploads.append((self.path, json.loads(body)))
+        self._send_json(202, {})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def eagleio_stub():
+    """
+    Serves a fresh `StubEagleIOHandler` on a local port. The handler class is
+    returned with the API root in `base_url`; set its attributes to change
+    the behaviour of the stub.
+    """
+    handler = type(
+        "StubEagleIO",
+        (StubEagleIOHandler,),
+        {"uploads": [], "accept_gzip": True, "gzip_status": 415, "fail_puts": 0},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    handler.base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    try:
+        yield handler
+    finally:
+        server.shutdown()
+        server.server_close()
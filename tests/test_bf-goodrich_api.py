@@ -1,5 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import json
 import os
+import time
+
+import numpy as np
 
 from bf_goodrich import itwin
 
@@ -49,3 +54,182 @@ def test_query_node_by_dates_outside():
         assert str(exc) == "No data found for the given sensor ID and date range."
     else:
         raise AssertionError("Expected Exception for no data found was not raised.")
+
+
+def test_adaptive_window():
+    window = itwin.AdaptiveWindow(initial_days=30, target_rows=1000, max_bytes=10**6)
+
+    # Empty windows grow, up to max_growth at a time
+    window.observe(30, 0, 10)
+    assert window.days == 120
+
+    # 100 rows per day: 10 days for 1000 rows
+    window.observe(120, 12000, 12000 * 50)
+    assert window.days == 10
+
+    # 500 bytes per row: the byte ceiling allows only 2000 rows, i.e. 2 days
+    window = itwin.AdaptiveWindow(initial_days=30, target_rows=10000, max_bytes=10**6)
+    window.observe(30, 30000, 30000 * 500)
+    assert window.days == 2
+
+    # Sparse data grows gradually and is clamped to max_days
+    window = itwin.AdaptiveWindow(initial_days=100, max_days=365)
+    window.observe(100, 10, 500)
+    assert window.days == 365
+
+
+def test_iter_windows(monkeypatch):
+    # Hourly data with a 90-day gap, ending 10 days ago
+    def hourly(start, days):
+        ts = [start + timedelta(hours=h) for h in range(days * 24)]
+        return {itwin._format_date(t): {"f": 1000.0, "T": 10.0} for t in ts}
+
+    first = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    first -= timedelta(days=200)
+    series = hourly(first, 60)
+    series.update(hourly(first + timedelta(days=150), 40))
+    calls = []
+
+    def query(sensor_id, start_date, end_date):
+        calls.append((start_date, end_date))
+        data = {k: v for k, v in series.items() if start_date <= k <= end_date}
+        return data or None, 100 * len(data)
+
+    monkeypatch.setattr(itwin, "_query_observations", query)
+
+    window = itwin.AdaptiveWindow(initial_days=1, target_rows=24 * 20)
+    received = {}
+    for start, end, data in itwin.iter_windows("sensor", itwin._format_date(first), window):
+        assert data and start < end
+        received.update(data)
+
+    assert received == series
+    # Far fewer calls than 1-day windows over 200 days
+    assert len(calls) < 25
+
+
+def test_token_provider(monkeypatch, tmp_path):
+    calls = []
+
+    def request_token():
+        time.sleep(0.05)
+        calls.append(1)
+        return {"access_token": f"token-{len(calls)}", "expires_in": 3600}
+
+    monkeypatch.setattr(itwin, "_request_token", request_token)
+    provider = itwin.TokenProvider(cache_dir=str(tmp_path), refresh_margin=300)
+
+    # Concurrent callers share a single token request
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        tokens = list(executor.map(lambda _: provider.get_token(), range(8)))
+    assert tokens == ["token-1"] * 8
+    assert len(calls) == 1
+
+    # Another process reuses the token cached on disk, readable by the owner only
+    path = provider._cache_path()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert itwin.TokenProvider(cache_dir=str(tmp_path)).get_token() == "token-1"
+    assert len(calls) == 1
+
+    # The token is refreshed once within the refresh margin of its expiry
+    provider._expires_at = time.time() + 200
+    with open(path, "w") as f:
+        json.dump({"access_token": "token-1", "expires_at": time.time() + 200}, f)
+    assert provider.get_token() == "token-2"
+    assert provider.get_token() == "token-2"
+
+    provider.invalidate()
+    assert not os.path.exists(path)
+    assert provider.get_token() == "token-3"
+
+
+def test_query_nodes(monkeypatch):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    series = {
+        sensor: {
+            itwin._format_date(start + timedelta(hours=h)): {"f": float(h), "T": 10.0}
+            for h in range(0, 24 * 100, step)
+        }
+        for sensor, step in [("a", 1), ("b", 5)]
+    }
+
+    calls = []
+
+    def query(sensor_id, start_date, end_date):
+        # Responses are truncated to 500 rows
+        calls.append((sensor_id, start_date, end_date))
+        rows = series.get(sensor_id, {})
+        keys = [k for k in rows if start_date <= k <= end_date][:500]
+        return {k: rows[k] for k in keys} or None, 0
+
+    monkeypatch.setattr(itwin, "_query_observations", query)
+
+    data = itwin.query_nodes(
+        ["a", "b", "c"],
+        start_date=itwin._format_date(start),
+        end_date=itwin._format_date(start + timedelta(days=120)),
+        max_workers=4,
+        partition_days=30,
+    )
+    assert data["a"] == series["a"]
+    assert list(data["a"]) == sorted(data["a"])
+    assert data["b"] == series["b"]
+    assert data["c"] == {}
+
+    # Untruncated sub-ranges cost one request, truncated ones are re-queried.
+    # "b" stops 20 days before the last sub-range ends, which costs one more
+    assert sum(1 for c in calls if c[0] == "b") == 5
+    assert sum(1 for c in calls if c[0] == "c") == 4
+    calls.clear()
+    end_date = itwin._format_date(start + timedelta(days=30))
+    assert len(itwin._query_range("b", itwin._format_date(start), end_date)) == 145
+    assert len(calls) == 1
+    calls.clear()
+    assert len(itwin._query_range("a", itwin._format_date(start), end_date)) == 721
+    assert len(calls) == 2
+
+    one = itwin.query_node(
+        "a",
+        start_date=itwin._format_date(start),
+        end_date=itwin._format_date(start + timedelta(days=120)),
+        max_workers=2,
+    )
+    assert one == series["a"]
+
+
+def test_observations_to_columns(monkeypatch):
+    data = {
+        "2025-02-05T17:00:00.000Z": {"f": 7711.34, "T": 17.30},
+        "2025-02-05T18:00:00.000Z": {"f": None, "T": 17.31},
+        "2025-02-05T19:00:00.000Z": {"f": 7711.70},
+    }
+    monkeypatch.setattr(itwin, "_query_observations", lambda *args: (data, 0))
+
+    timestamps, columns = itwin.query_node_by_dates("sensor", columnar=True)
+    assert timestamps.dtype == "datetime64[ms]"
+    assert str(timestamps[0]) == "2025-02-05T17:00:00.000"
+    assert list(columns) == ["f", "T"]
+    assert columns["f"][0] == 7711.34
+    assert np.isnan(columns["f"][1])
+    assert np.isnan(columns["T"][2])
+    assert itwin._get_latest_date_from_data(data) == "2025-02-05T19:00:00.000Z"
+
+    timestamps, columns = itwin.observations_to_columns({})
+    assert len(timestamps) == 0 and columns == {}
+
+    # Keys missing from the first row
+    data = {
+        "2025-02-05T17:00:00.000Z": {"f": 7711.34},
+        "2025-02-05T18:00:00.000Z": {"f": 7711.50, "T": 17.31},
+    }
+    _, columns = itwin.observations_to_columns(data)
+    assert list(columns) == ["f", "T"]
+    assert np.isnan(columns["T"][0]) and columns["T"][1] == 17.31
+
+    # Requested keys, even when absent from every row
+    data = {"2025-02-05T17:00:00.000Z": {"f": 7711.34}}
+    _, columns = itwin.observations_to_columns(data, keys=["f", "T"])
+    assert list(columns) == ["f", "T"]
+    assert np.isnan(columns["T"][0])
+    _, columns = itwin.observations_to_columns({}, keys=["f", "T"])
+    assert len(columns["f"]) == len(columns["T"]) == 0
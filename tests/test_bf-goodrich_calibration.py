@@ -0,0 +1,144 @@
+import json
+import numpy as np
+import os
+
+from bf_goodrich import compute
+from bf_goodrich.calibration import CalibrationRegistry
+
+DEVICES = json.load(
+    open(
+        os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "bf_goodrich", "devices.json")
+        ),
+        "r",
+    )
+)
+
+
+def test_registry_from_json():
+    registry = CalibrationRegistry.from_json()
+    assert len(registry) == len(DEVICES)
+
+    sensor_info = DEVICES["LW-02S"]
+    assert registry.index(sensor_info["id"]) == registry.index("LW-02S")
+    calibration = registry.get(sensor_info["id"])
+    assert calibration["r0"] == sensor_info["r0"]
+    assert calibration["sensor_elevation"] == (
+        sensor_info["ground_elev"] - sensor_info["sensor_depth"]
+    )
+
+    timestamps = ["2025-02-05T17:00:00.000Z", "2025-02-05T18:00:00.000Z"]
+    frequency = [7711.0, 7712.0]
+    temperature = [17.0, 18.0]
+    expected = compute.compute_piezo_elevation(
+        timestamps, frequency, temperature, sensor_info
+    )
+    elevation = registry.compute_elevation("LW-02S", timestamps, frequency, temperature)
+    assert np.allclose(elevation, [v["water_elevation"] for v in expected.values()])
+
+    for coefficients in [
+        registry.coefficients("LW-02S", timestamps),
+        registry.get("LW-02S"),
+    ]:
+        result = compute.compute_piezo_elevation(
+            timestamps, frequency, temperature, coefficients
+        )
+        assert result == expected
+
+    try:
+        registry.index("XX")
+    except KeyError as exc:
+        assert "XX" in str(exc)
+    else:
+        raise AssertionError("Expected KeyError for an unknown device")
+
+
+def test_registry_versioned_calibrations():
+    devices = {
+        "LW-02S": {
+            **DEVICES["LW-02S"],
+            "calibrations": [
+                {"effective_from": "2025-03-01T00:00:00.000Z", "r0": 9000.0},
+                {"effective_from": "2025-06-01T00:00:00.000Z", "ground_elev": 300.0},
+            ],
+        },
+        "LW-02D": DEVICES["LW-02D"],
+    }
+    registry = CalibrationRegistry(devices)
+
+    timestamps = np.array(
+        [
+            "2025-01-01T00:00:00",
+            "2025-03-01T00:00:00",
+            "2025-04-01T00:00:00",
+            "2025-07-01T00:00:00",
+        ],
+        dtype="datetime64[ms]",
+    )
+    coefficients = registry.coefficients("LW-02S", timestamps)
+    r0 = DEVICES["LW-02S"]["r0"]
+    assert coefficients["r0"].tolist() == [r0, 9000.0, 9000.0, 9000.0]
+    depth = DEVICES["LW-02S"]["sensor_depth"]
+    ground_elev = DEVICES["LW-02S"]["ground_elev"]
+    assert coefficients["sensor_elevation"].tolist() == [
+        ground_elev - depth,
+        ground_elev - depth,
+        ground_elev - depth,
+        300.0 - depth,
+    ]
+
+    # The latest calibration, and devices without versions
+    assert registry.get("LW-02S")["r0"] == 9000.0
+    assert registry.get("LW-02D")["r0"] == DEVICES["LW-02D"]["r0"]
+    assert registry.coefficients("LW-02D", timestamps)["r0"].tolist() == [
+        DEVICES["LW-02D"]["r0"]
+    ] * 4
+
+    # Readings of many devices, by name or sensor ID
+    keys = ["LW-02S", DEVICES["LW-02D"]["id"], "LW-02S", "LW-02D"]
+    coefficients = registry.coefficients_for(keys, timestamps)
+    r0_02d = DEVICES["LW-02D"]["r0"]
+    assert coefficients["r0"].tolist() == [r0, r0_02d, 9000.0, r0_02d]
+    assert coefficients["sensor_elevation"][3] == (
+        DEVICES["LW-02D"]["ground_elev"] - DEVICES["LW-02D"]["sensor_depth"]
+    )
+    latest = registry.coefficients_for(keys)
+    assert latest["r0"].tolist() == [9000.0, r0_02d, 9000.0, r0_02d]
+
+    elevation = compute.compute_piezo_elevations(
+        keys, [7711.0] * 4, [17.0] * 4, registry, timestamps
+    )
+    for i, key in enumerate(keys):
+        expected = registry.compute_elevation(
+            key, timestamps[i : i + 1], [7711.0], [17.0]
+        )
+        assert np.isclose(elevation[i], expected[0])
+
+
+def test_registry_validation():
+    invalid = [
+        {"LW-02S": {k: v for k, v in DEVICES["LW-02S"].items() if k != "k"}},
+        {"LW-02S": {**DEVICES["LW-02S"], "r0": "8964.4"}},
+        {"LW-02S": DEVICES["LW-02S"], "copy": DEVICES["LW-02S"]},
+        {"LW-02S": DEVICES["LW-02S"], DEVICES["LW-02D"]["id"]: DEVICES["LW-02D"]},
+        {
+            "LW-02S": DEVICES["LW-02S"],
+            "LW-02D": {**DEVICES["LW-02D"], "id": "LW-02S"},
+        },
+        {
+            "LW-02S": {
+                **DEVICES["LW-02S"],
+                "calibrations": [
+                    {"effective_from": "2025-06-01T00:00:00.000Z", "r0": 9000.0},
+                    {"effective_from": "2025-03-01T00:00:00.000Z", "r0": 9100.0},
+                ],
+            }
+        },
+    ]
+    for devices in invalid:
+        try:
+            CalibrationRegistry(devices)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"Expected ValueError for {devices}")
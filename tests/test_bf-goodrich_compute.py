@@ -5,6 +5,8 @@ import os
 import pandas as pd
 
 from bf_goodrich import compute
+from bf_goodrich.calibration import CalibrationRegistry
+from eagleio import jts
 
 logger = logging.getLogger(__name__)
 
@@ -121,3 +123,103 @@ def test_compute_piezo_elevation():
     assert (
         "water_elevation" in result["2025-02-05T17:00:00.000Z"]
     ), "Water elevation should be present"
+
+
+def test_piezo_kernel():
+    sensor_info = get_sensor("LW-02S")
+    kwargs = {key: sensor_info[key] for key in ("r0", "t0", "poly_a", "poly_b", "k")}
+    frequency = np.array([7950.10, 7711.0])
+    temperature = np.array([17.6, 17.0])
+
+    psi, head, elevation = compute.piezo_kernel(
+        frequency, temperature, **kwargs, sensor_elevation=274.09
+    )
+    assert np.allclose(psi, compute.get_pressure_psi(frequency, temperature, **kwargs))
+    assert np.allclose(head, compute.get_pressure_head(frequency, temperature, **kwargs))
+    assert np.allclose(elevation, head + 274.09)
+    assert abs(head[0] - 31.481523) < 0.0001
+
+
+def test_compute_piezo_elevations():
+    """
+    Computes the water elevation of all sensors in one call and compares it
+    with the per-sensor computation.
+    """
+    path = os.path.join(TEST_DIR, "readings.txt")
+    df = pd.read_csv(path, sep="\t", header=0)
+    df = df.sample(frac=1, random_state=0)  # Interleave the sensors
+
+    registry = CalibrationRegistry(DEVICES)
+    elevation = compute.compute_piezo_elevations(
+        df["sensor"].values, df["frequency"].values, df["temperature"].values, registry
+    )
+
+    for sensor in get_all_sensors_names():
+        mask = (df["sensor"] == sensor).to_numpy()
+        expected = compute.compute_piezo_elevation(
+            df.index[mask].tolist(),
+            df["frequency"].values[mask],
+            df["temperature"].values[mask],
+            get_sensor(sensor),
+        )
+        expected = [v["water_elevation"] for v in expected.values()]
+        assert np.allclose(elevation[mask], expected)
+
+    try:
+        compute.compute_piezo_elevations(
+            ["LW-02S", "XX"], [7711, 7711], [17, 17], registry
+        )
+    except KeyError as exc:
+        assert "XX" in str(exc)
+    else:
+        raise AssertionError("Expected KeyError for an unknown sensor")
+
+
+def test_iter_piezo_elevation():
+    path = os.path.join(TEST_DIR, "readings.txt")
+    df = pd.read_csv(path, sep="\t", header=0)
+    df = df[df["sensor"] == "LW-02S"].reset_index(drop=True)
+    sensor_info = get_sensor("LW-02S")
+
+    def chunks(size):
+        for start in range(0, len(df), size):
+            chunk = df.iloc[start : start + size]
+            yield chunk.index.values, chunk["frequency"].values, chunk["temperature"].values
+
+    expected = compute.compute_piezo_elevation(
+        df.index.tolist(), df["frequency"].values, df["temperature"].values, sensor_info
+    )
+    results = list(compute.iter_piezo_elevation(chunks(3), sensor_info))
+    assert len(results) == -(-len(df) // 3)
+
+    timestamps = np.concatenate([ts for ts, _ in results])
+    elevation = np.concatenate([c["water_elevation"] for _, c in results])
+    assert timestamps.tolist() == list(expected)
+    assert np.allclose(elevation, [v["water_elevation"] for v in expected.values()])
+
+
+def test_compute_piezo_elevation_columnar():
+    timestamps = np.array(
+        ["2025-02-05T17:00:00", "2025-02-05T18:00:00", "2025-02-05T19:00:00"],
+        dtype="datetime64[ms]",
+    )
+    frequencies = np.array([7711.0, 7712.0, 7713.0])
+    temperatures = np.array([17.0, 18.0, 19.0])
+    sensor_info = get_sensor("LW-02S")
+
+    ts, columns = compute.compute_piezo_elevation(
+        timestamps, frequencies, temperatures, sensor_info, columnar=True
+    )
+    assert ts is timestamps
+    assert list(columns) == ["water_elevation"]
+    assert isinstance(columns["water_elevation"], np.ndarray)
+
+    # Same JTS document as the per-reading output
+    expected = compute.compute_piezo_elevation(
+        [f"{t}Z" for t in timestamps.astype(str)], frequencies, temperatures, sensor_info
+    )
+    mapper = {"water_elevation": "Water Elevation (ft)"}
+    units = {"water_elevation": "ft"}
+    assert json.loads(jts.columns_to_jts(ts, columns, mapper, units)) == json.loads(
+        jts.columns_to_jts(*jts.object_data_to_columns(expected), mapper, units)
+    )
@@ -0,0 +1,147 @@
+import itertools
+import os
+import threading
+
+from bf_goodrich import etl
+from eagleio.api import EagleIOWorkspace
+from eagleio.dedup import UploadDeduplicator
+from eagleio.state import SyncStateStore
+
+NAMES_MAPPER = {"f": "Frequency", "T": "Temperature"}
+UNITS = {"f": "Hz", "T": "C"}
+
+
+def test_get_start_dates_rewinds_deduplicator(eagleio_stub, tmp_path):
+    # The stub's latest timestamp for LW-02S is 18:00
+    data = {
+        f"2025-02-05T{h}:00:00.000Z": {"f": 1000.0 + h, "T": h} for h in range(17, 21)
+    }
+    store = SyncStateStore(os.path.join(tmp_path, "sync_state.sqlite"))
+    dedup = UploadDeduplicator(os.path.join(tmp_path, "sync_state.sqlite"))
+
+    with EagleIOWorkspace(
+        "test-key", base_url=eagleio_stub.base_url, deduplicator=dedup
+    ) as e:
+        e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+        store.record_upload("LW-02S", "2025-02-05T20:00:00.000Z", rows=4)
+
+        # Rows after the Eagle.io watermark are uploaded again
+        start_dates = etl.get_start_dates(["LW-02S"], e, store)
+        assert start_dates == {"LW-02S": "2025-02-04T18:00:00.000Z"}
+        assert store.get_last_timestamp("LW-02S") == "2025-02-05T18:00:00.000Z"
+        summary = e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+    assert (summary["rows"], summary["skipped_rows"]) == (2, 2)
+    assert [row["ts"] for row in eagleio_stub.uploads[1][1]["data"]] == [
+        "2025-02-05T19:00:00.000Z",
+        "2025-02-05T20:00:00.000Z",
+    ]
+
+
+def count(produced: list):
+    for i in itertools.count():
+        produced.append(i)
+        yield i
+
+
+def test_prefetch():
+    assert list(etl._prefetch(iter(range(10)), maxsize=2)) == list(range(10))
+    assert list(etl._prefetch(iter([]))) == []
+
+
+def test_prefetch_producer_error():
+    def fail():
+        yield 0
+        yield 1
+        raise RuntimeError("iTwin IoT unavailable")
+
+    items = []
+    try:
+        for item in etl._prefetch(fail()):
+            items.append(item)
+    except RuntimeError as exc:
+        assert str(exc) == "iTwin IoT unavailable"
+    else:
+        raise AssertionError("Expected the producer's RuntimeError")
+    assert items == [0, 1]
+
+
+def test_prefetch_stops_producer():
+    threads = threading.active_count()
+
+    # The consumer stops early
+    produced = []
+    items = etl._prefetch(count(produced), maxsize=1)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    items.close()
+    assert threading.active_count() == threads
+    assert len(produced) <= 3 + 1 + 2
+
+    # The consumer raises
+    produced = []
+    try:
+        for item in etl._prefetch(count(produced), maxsize=1):
+            if item == 2:
+                raise ValueError("Failed to load data to datasource")
+    except ValueError:
+        pass
+    assert threading.active_count() == threads
+    assert len(produced) <= 3 + 1 + 2
+
+
+def test_run_piezometers(monkeypatch):
+    def process_piezometer(device, start_date, eagleio, store):
+        if device == "LW-02D":
+            raise ValueError("Failed to load data to datasource")
+        return {"windows": 1, "rows": 10, "latest_date": start_date}
+
+    monkeypatch.setattr(etl, "process_piezometer", process_piezometer)
+    devices = ["LW-02S", "LW-02D", "LW-04S"]
+    start_dates = {device: "2025-02-05T17:00:00.000Z" for device in devices}
+    results = etl.run_piezometers(devices, start_dates, None, None, max_workers=2)
+
+    assert list(results) == devices
+    assert results["LW-02D"]["status"] == "failed"
+    assert "Failed to load data to datasource" in results["LW-02D"]["error"]
+    for device in ["LW-02S", "LW-04S"]:
+        assert results[device]["status"] == "ok"
+        assert results[device]["error"] is None
+        assert results[device]["rows"] == 10
+        assert results[device]["elapsed"] >= 0
+
+
+def test_get_start_dates_millisecond_watermark(tmp_path):
+    class Deduplicator:
+        def __init__(self):
+            self.forgotten = []
+
+        def forget(self, datasource, after):
+            self.forgotten.append((datasource, after))
+
+    class Workspace:
+        def __init__(self, watermark):
+            self.watermark = watermark
+            self.deduplicator = Deduplicator()
+
+        def get_watermarks(self, names):
+            return {name: self.watermark for name in names}
+
+        def get_datasource_id_by_name(self, name):
+            return "ds1"
+
+    # The same instant, with microsecond or millisecond precision
+    for watermark in ["2025-02-05T18:00:00.123000Z", "2025-02-05T18:00:00.123Z"]:
+        store = SyncStateStore(os.path.join(tmp_path, f"{watermark}.sqlite"))
+        store.record_upload("LW-02S", "2025-02-05T18:00:00.123Z", rows=1)
+        e = Workspace(watermark)
+        etl.get_start_dates(["LW-02S"], e, store)
+        assert e.deduplicator.forgotten == []
+
+    # An earlier instant rewinds the deduplicator
+    store = SyncStateStore(os.path.join(tmp_path, "sync_state.sqlite"))
+    store.record_upload("LW-02S", "2025-02-05T18:00:00.123Z", rows=1)
+    e = Workspace("2025-02-05T18:00:00.122Z")
+    etl.get_start_dates(["LW-02S"], e, store)
+    [(datasource, after)] = e.deduplicator.forgotten
+    assert datasource == "ds1"
+    assert after.isoformat() == "2025-02-05T18:00:00.122000+00:00"
+
@@ -27,3 +27,11 @@ def test_get_manual_data():
         type(data[k]["water_elevation"]) is float
     ), "Water elevation should be a float"
     assert k.endswith("Z"), "Timestamp should end with 'Z' indicating UTC time"
+
+
+def test_iter_manual_data():
+    rows = nwps.iter_manual_data()
+    k, v = next(rows)
+    assert k.endswith(".000Z"), "Timestamp should end with '.000Z'"
+    assert type(v["water_elevation"]) is float, "Water elevation should be a float"
+    assert dict(nwps.iter_manual_data()) == nwps.get_manual_data()
@@ -62,6 +62,16 @@ def test_get_datasource_id_by_name():
         )
 
 
+def test_get_children_ids():
+    ds = e.get_datasource_id_by_name("LW-02S")
+    children = e.get_children_ids(ds)
+    assert len(children) > 0, "Datasource should have parameter nodes"
+    for child in children:
+        assert e.get_node_by_id(child)["parentId"] == ds
+
+    assert e.get_children_ids("Nonexistent Node") == []
+
+
 def test_ts_object_data_to_jts():
 
     data = {
@@ -115,4 +125,42 @@ def test_get_latest_timestamp_from_datasource_by_name():
 
     ts = e.get_latest_timestamp_from_datasource_by_name("LW-02S")
     assert type(ts) is str, "Latest timestamp should be a string"
-    assert ts.endswith(".000Z"), "Latest timestamp should end with 'Z'"
\ No newline at end of file
+    assert ts.endswith(".000Z"), "Latest timestamp should end with 'Z'"
+
+
+def test_get_latest_timestamp_from_datasource_by_name_concurrent():
+
+    ts = e.get_latest_timestamp_from_datasource_by_name("LW-02S")
+    ts_concurrent = e.get_latest_timestamp_from_datasource_by_name(
+        "LW-02S", max_workers=4
+    )
+    assert ts_concurrent == ts
+
+
+def test_get_latest_timestamps_from_datasources_by_name():
+
+    names = ["LW-02S", "LW-02D", "Nonexistent Datasource"]
+    results = e.get_latest_timestamps_from_datasources_by_name(names)
+    assert list(results.keys()) == names
+    assert results["LW-02S"].endswith(".000Z")
+    assert results["Nonexistent Datasource"] is None
+
+
+def test_get_watermarks():
+    names = ["LW-02S", "Nonexistent Datasource"]
+    watermarks = e.get_watermarks(names)
+    assert watermarks["Nonexistent Datasource"] is None
+    assert watermarks["LW-02S"] == e.get_latest_timestamp_from_datasource_by_name(
+        "LW-02S"
+    )
+
+
+def test_get_historic_data():
+    ds = e.get_datasource_id_by_name("LW-02S")
+    children = e.get_children_ids(ds)
+    df = e.get_historic_data(
+        children, "2025-01-01T00:00:00.000Z", "2025-03-01T00:00:00.000Z"
+    )
+    assert list(df.columns) == children
+    assert df.index.is_monotonic_increasing
+    assert not df.index.has_duplicates
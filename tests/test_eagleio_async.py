@@ -0,0 +1,141 @@
+import asyncio
+
+import numpy as np
+
+from eagleio.async_api import AsyncEagleIOWorkspace
+from eagleio.dedup import UploadDeduplicator
+from eagleio.ratelimit import AdaptiveConcurrencyController
+
+NAMES_MAPPER = {"f": "Frequency", "T": "Temperature"}
+UNITS = {"f": "Hz", "T": "C"}
+
+
+def test_async_get_datasource_id_by_name(eagleio_stub):
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.get_datasource_id_by_name("LW-02S")
+
+    assert asyncio.run(run()) == "ds1"
+
+
+def test_async_get_latest_timestamps(eagleio_stub):
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.get_latest_timestamps_from_datasources_by_name(
+                ["LW-02S", "Nonexistent Datasource"]
+            )
+
+    assert asyncio.run(run()) == {
+        "LW-02S": "2025-02-05T18:00:00.000Z",
+        "Nonexistent Datasource": None,
+    }
+
+
+def test_async_get_watermarks(eagleio_stub):
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.get_watermarks(["LW-02S", "Nonexistent Datasource"])
+
+    assert asyncio.run(run()) == {
+        "LW-02S": "2025-02-05T18:00:00.000Z",
+        "Nonexistent Datasource": None,
+    }
+
+
+def test_async_get_historic_data(eagleio_stub):
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.get_historic_data(
+                ["p1", "p2"], "2025-02-05T00:00:00.000Z", "2025-02-06T00:00:00.000Z"
+            )
+
+    df = asyncio.run(run())
+    assert list(df.columns) == ["p1", "p2"]
+    assert len(df) == 3
+
+
+def test_async_load_data_to_datasource(eagleio_stub):
+    data = {
+        "2025-02-05T17:00:00.000Z": {"f": 1000, "T": 1},
+        "2025-02-05T18:00:00.000Z": {"f": 1500, "T": 2},
+    }
+
+    async def run():
+        async with AsyncEagleIOWorkspace(
+            "test-key", base_url=eagleio_stub.base_url, max_concurrency=2
+        ) as e:
+            return await asyncio.gather(
+                *[
+                    e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+                    for _ in range(4)
+                ]
+            )
+
+    summaries = asyncio.run(run())
+    assert [summary["rows"] for summary in summaries] == [2] * 4
+    assert len(eagleio_stub.uploads) == 4
+    assert eagleio_stub.uploads[0][0] == "/api/v1/nodes/ds1/historic"
+
+
+def test_async_stream_data_to_datasource(eagleio_stub):
+    def rows():
+        for h in range(24):
+            yield f"2025-02-05T{h:02d}:00:00.000Z", {"f": 1000 + h, "T": h}
+
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.stream_data_to_datasource(
+                "LW-02S", rows(), NAMES_MAPPER, UNITS, batch_rows=5
+            )
+
+    assert asyncio.run(run())["rows"] == 24
+    assert len(eagleio_stub.uploads[0][1]["data"]) == 24
+
+
+def test_async_stream_chunks_to_datasource(eagleio_stub):
+    def chunks():
+        for day in range(3):
+            timestamps = np.arange(
+                f"2025-02-0{day + 1}T00:00",
+                f"2025-02-0{day + 2}T00:00",
+                60,
+                dtype="datetime64[m]",
+            )
+            yield timestamps, {"water_elevation": np.full(len(timestamps), 280.5)}
+
+    async def run():
+        async with AsyncEagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+            return await e.stream_chunks_to_datasource(
+                "LW-02S",
+                chunks(),
+                {"water_elevation": "Water Elevation (ft)"},
+                {"water_elevation": "ft"},
+            )
+
+    assert asyncio.run(run())["rows"] == 72
+    assert len(eagleio_stub.uploads[0][1]["data"]) == 72
+
+
+def test_async_load_data_to_datasource_deduplicated(eagleio_stub, tmp_path):
+    data = {
+        f"2025-02-05T{h:02d}:00:00.000Z": {"f": 1000 + h, "T": h} for h in range(10)
+    }
+    controller = AdaptiveConcurrencyController(max_limit=2)
+    dedup = UploadDeduplicator(str(tmp_path / "sent_rows.sqlite"))
+
+    async def run():
+        async with AsyncEagleIOWorkspace(
+            "test-key",
+            base_url=eagleio_stub.base_url,
+            controller=controller,
+            deduplicator=dedup,
+        ) as e:
+            assert e.workspace.controller is controller
+            first = await e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+            second = await e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert (first["rows"], first["skipped_rows"]) == (10, 0)
+    assert (second["rows"], second["skipped_rows"]) == (0, 10)
+    assert len(eagleio_stub.uploads) == 1
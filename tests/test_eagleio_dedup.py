@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from eagleio.dedup import UploadDeduplicator, row_digests, stream_id
+
+TIMESTAMPS = [
+    "2025-02-05T17:00:00.000Z",
+    "2025-02-05T18:00:00.000Z",
+    "2025-02-05T19:00:00.000Z",
+]
+
+
+def test_row_digests():
+    columns = {"f": np.array([1000.0, 1500.0, np.nan]), "T": np.array([16, 17, 18])}
+    digests = row_digests(columns)
+    assert digests.dtype == np.int64
+    assert len(set(digests.tolist())) == 3
+
+    # Same values give the same digests, whatever the dtype or NaN payload
+    same = {"f": [1000, 1500, float("nan")], "T": [16.0, 17.0, 18.0]}
+    assert np.array_equal(row_digests(same), digests)
+
+    # Values are not interchangeable between columns
+    swapped = {"T": columns["T"], "f": columns["f"]}
+    assert not np.array_equal(row_digests(swapped), digests)
+
+
+def test_stream_id():
+    assert stream_id(["f", "T"]) == stream_id(["T", "f"])
+    assert stream_id(["f", "T"]) != stream_id(["water_elevation"])
+
+
+def test_filter_and_record(tmp_path):
+    dedup = UploadDeduplicator(os.path.join(tmp_path, "sent_rows.sqlite"))
+    columns = {"f": np.array([1000.0, 1500.0, 1800.0])}
+
+    mask, digests = dedup.filter("ds1", TIMESTAMPS, columns)
+    assert mask.all()
+    dedup.record("ds1", columns, TIMESTAMPS[:2], digests[:2])
+
+    # Rows already sent are dropped, unless their value changed
+    mask, _ = dedup.filter("ds1", TIMESTAMPS, columns)
+    assert mask.tolist() == [False, False, True]
+    mask, _ = dedup.filter("ds1", TIMESTAMPS, {"f": np.array([1000.0, 1.0, 1800.0])})
+    assert mask.tolist() == [False, True, True]
+
+    # Other datasources and other columns are indexed separately
+    assert dedup.filter("ds2", TIMESTAMPS, columns)[0].all()
+    assert dedup.filter("ds1", TIMESTAMPS, {"T": columns["f"]})[0].all()
+
+    # Datetime timestamps match the equivalent JTS strings
+    timestamps = np.array([t[:-1] for t in TIMESTAMPS], dtype="datetime64[ms]")
+    mask, _ = dedup.filter("ds1", timestamps, columns)
+    assert mask.tolist() == [False, False, True]
+
+
+def test_forget(tmp_path):
+    dedup = UploadDeduplicator(os.path.join(tmp_path, "sent_rows.sqlite"))
+    columns = {"f": np.array([1000.0, 1500.0, 1800.0])}
+    for datasource in ["ds1", "ds2"]:
+        _, digests = dedup.filter(datasource, TIMESTAMPS, columns)
+        dedup.record(datasource, columns, TIMESTAMPS, digests)
+
+    assert dedup.forget("ds1", TIMESTAMPS[0]) == 2
+    assert dedup.filter("ds1", TIMESTAMPS, columns)[0].tolist() == [False, True, True]
+    assert not dedup.filter("ds2", TIMESTAMPS, columns)[0].any()
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+import json
+
+import numpy as np
+import pandas as pd
+
+from eagleio import api, jts
+
+
+def test_columns_to_jts():
+    data = {
+        "2025-02-05T17:00:00.000Z": {"f": 1000.5, "T": 16},
+        "2025-02-05T18:00:00.000Z": {"f": 1500.25, "T": 17},
+        "2025-02-05T19:00:00.000Z": {"T": 12, "f": 4400.0},
+    }
+    names_mapper = {"f": "Frequency", "T": "Temperature"}
+    units = {"f": "Hz", "T": "C"}
+    expected = api.EagleIOWorkspace._ts_object_data_to_jts(data, names_mapper, units)
+    expected = json.loads(json.dumps(expected))
+
+    # Object-based data
+    timestamps, columns = jts.object_data_to_columns(data)
+    result = jts.columns_to_jts(timestamps, columns, names_mapper, units)
+    assert json.loads(result) == expected
+
+    # NumPy arrays with datetime64 timestamps
+    timestamps = np.array(
+        ["2025-02-05T17:00", "2025-02-05T18:00", "2025-02-05T19:00"],
+        dtype="datetime64[ms]",
+    )
+    columns = {"f": np.array([1000.5, 1500.25, 4400.0]), "T": np.array([16, 17, 12])}
+    result = jts.columns_to_jts(timestamps, columns, names_mapper, units)
+    assert json.loads(result) == expected
+
+    # DataFrame with a timezone-aware index
+    df = pd.DataFrame(
+        columns,
+        index=pd.DatetimeIndex(timestamps).tz_localize("UTC").tz_convert("US/Eastern"),
+    )
+    result = jts.columns_to_jts(*jts.dataframe_to_columns(df), names_mapper, units)
+    assert json.loads(result) == expected
+
+
+def test_columns_to_jts_invalid_values():
+    result = jts.columns_to_jts(
+        ["2025-02-05T17:00:00.000Z", "2025-02-05T18:00:00.000Z"],
+        {"water_elevation": np.array([np.nan, 300.1])},
+        {"water_elevation": "Water Elevation (ft)"},
+        {"water_elevation": "ft"},
+    )
+    data = json.loads(result)["data"]
+    assert data[0]["f"]["0"]["v"] is None
+    assert data[1]["f"]["0"]["v"] == 300.1
+
+    try:
+        jts.columns_to_jts(
+            ["2025-02-05T17:00:00.000Z"],
+            {"f": [1, 2]},
+            {"f": "Frequency"},
+            {"f": "Hz"},
+        )
+    except ValueError as exc:
+        assert str(exc) == "Column 'f' has 2 values but there are 1 timestamps"
+    else:
+        raise AssertionError("Expected ValueError for mismatched lengths")
+
+
+def test_format_timestamps():
+    expected = ["2025-02-05T17:00:00.000Z", "2025-02-05T18:30:00.000Z"]
+    naive = [datetime(2025, 2, 5, 17), datetime(2025, 2, 5, 18, 30)]
+    aware = [
+        datetime(2025, 2, 5, 12, tzinfo=timezone(timedelta(hours=-5))),
+        pd.Timestamp("2025-02-05T18:30:00", tz="UTC"),
+    ]
+    assert jts.format_timestamps(naive).tolist() == expected
+    assert jts.format_timestamps(aware).tolist() == expected
+    assert jts.format_timestamps(expected).tolist() == expected
+    assert jts.format_timestamps([]).tolist() == []
+
+    for invalid in [[1.5, 2.5], ["2025-02-05T17:00:00.000Z", 1]]:
+        try:
+            jts.format_timestamps(invalid)
+        except TypeError:
+            pass
+        else:
+            raise AssertionError(f"Expected TypeError for {invalid}")
+
+
+def test_object_data_to_columns_empty():
+    assert jts.object_data_to_columns({}) == ([], {})
+
+
+def test_split_rows():
+    timestamps = np.arange(
+        np.datetime64("2025-01-01T00:00", "ms"),
+        np.datetime64("2025-01-01T10:00", "ms"),
+        np.timedelta64(1, "h"),
+    )
+    header = jts.encode_header(["f"], {"f": "Frequency"}, {"f": "Hz"})
+    rows = jts.encode_rows(timestamps, {"f": np.arange(10) * 1000.0})
+
+    assert jts.split_rows(rows) == [rows]
+
+    chunks = jts.split_rows(rows, max_rows=4)
+    assert [len(c) for c in chunks] == [4, 4, 2]
+
+    max_bytes = len(jts.build_document(header, rows[:3]))
+    chunks = jts.split_rows(rows, max_bytes=max_bytes, header=header)
+    assert sum(chunks, []) == rows
+    for chunk in chunks:
+        assert len(jts.build_document(header, chunk)) <= max_bytes
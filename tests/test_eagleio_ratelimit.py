@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import threading
+import time
+
+import requests
+
+from eagleio.ratelimit import AdaptiveConcurrencyController, parse_retry_after
+
+
+def make_response(status_code: int, retry_after: str = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return response
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("invalid") is None
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-1") == 0.0
+
+    date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), True)
+    assert 25 < parse_retry_after(date) <= 30
+
+
+def test_retry_after_throttling():
+    controller = AdaptiveConcurrencyController(initial_limit=4)
+    responses = [make_response(429, "0.2"), make_response(200)]
+
+    start = time.monotonic()
+    response = controller.call(lambda: responses.pop(0))
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 0.2
+    assert controller.throttled == 1
+    assert controller.limit < 4
+
+
+def test_retries_exhausted():
+    controller = AdaptiveConcurrencyController(max_retries=2, backoff_base=0.01)
+    calls = []
+
+    def send():
+        calls.append(1)
+        return make_response(503)
+
+    assert controller.call(send).status_code == 503
+    assert len(calls) == 3
+
+    calls.clear()
+    assert controller.call(send, retry=False).status_code == 503
+    assert len(calls) == 1
+
+
+def test_limit_adapts():
+    controller = AdaptiveConcurrencyController(
+        initial_limit=2, max_limit=4, target_latency=0.05
+    )
+    for _ in range(20):
+        controller.call(lambda: make_response(200))
+    assert controller.limit == 4
+
+    # Slow responses reduce the limit
+    controller.call(lambda: time.sleep(0.06) or make_response(200))
+    assert controller.limit == 2
+
+
+def test_in_flight_limit():
+    controller = AdaptiveConcurrencyController(initial_limit=2, max_limit=2)
+    peak = []
+
+    def send():
+        peak.append(controller.in_flight)
+        time.sleep(0.05)
+        return make_response(200)
+
+    threads = [
+        threading.Thread(target=controller.call, args=(send,)) for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+    assert controller.in_flight == 0
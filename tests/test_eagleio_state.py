@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import os
+
+from eagleio.state import SyncStateStore
+
+
+def test_record_upload(tmp_path):
+    store = SyncStateStore(os.path.join(tmp_path, "state", "sync_state.sqlite"))
+    assert store.get("LW-02S") is None
+    assert store.get_last_timestamp("LW-02S") is None
+
+    store.record_upload("LW-02S", "2025-02-05T18:00:00.000Z", rows=10)
+    store.record_upload("LW-02S", "2025-02-06T18:00:00.000Z", rows=5)
+    # Older uploads do not rewind the high-water mark
+    store.record_upload("LW-02S", "2025-01-01T00:00:00.000Z", rows=1)
+
+    state = store.get("LW-02S")
+    assert state["last_timestamp"] == "2025-02-06T18:00:00.000Z"
+    assert state["rows"] == 16
+    assert state["uploads"] == 3
+    assert state["reconciled_at"] is None
+
+
+def test_reconcile(tmp_path):
+    store = SyncStateStore(os.path.join(tmp_path, "sync_state.sqlite"))
+    assert store.needs_reconcile("LW-02S", timedelta(days=7))
+
+    store.record_upload("LW-02S", "2025-02-06T18:00:00.000Z", rows=5)
+    assert store.needs_reconcile("LW-02S", timedelta(days=7))
+
+    # Eagle.io is authoritative, even when behind the local state
+    store.reconcile("LW-02S", "2025-02-05T18:00:00.000Z")
+    assert store.get_last_timestamp("LW-02S") == "2025-02-05T18:00:00.000Z"
+    assert not store.needs_reconcile("LW-02S", timedelta(days=7))
+    assert store.needs_reconcile("LW-02S", timedelta(seconds=-1))
+    assert store.get("LW-02S")["rows"] == 5
+
+
+def test_concurrent_record_upload(tmp_path):
+    path = os.path.join(tmp_path, "sync_state.sqlite")
+
+    def record(i):
+        SyncStateStore(path).record_upload("LW-02S", f"2025-02-{i:02d}", rows=1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(record, range(1, 29)))
+
+    state = SyncStateStore(path).get("LW-02S")
+    assert state["rows"] == 28
+    assert state["last_timestamp"] == "2025-02-28"
@@ -0,0 +1,317 @@
+from datetime import datetime, timezone
+import os
+
+import numpy as np
+
+from eagleio import jts
+from eagleio.api import EagleIOWorkspace
+from eagleio.dedup import UploadDeduplicator
+
+NAMES_MAPPER = {"f": "Frequency", "T": "Temperature"}
+UNITS = {"f": "Hz", "T": "C"}
+
+# Minimal node tree: a location with one datasource and two parameters
+NODES = [
+    {
+        "_id": "loc1",
+        "_class": "io.eagle.models.node.location.Location",
+        "name": "LW-02",
+    },
+    {
+        "_id": "ds1",
+        "_class": "io.eagle.models.node.source.data.Jts",
+        "name": "LW-02S",
+        "parentId": "loc1",
+    },
+    {
+        "_id": "p1",
+        "_class": "io.eagle.models.node.point.NumberPoint",
+        "name": "Frequency",
+        "parentId": "ds1",
+    },
+    {
+        "_id": "p2",
+        "_class": "io.eagle.models.node.point.NumberPoint",
+        "name": "Temperature",
+        "parentId": "ds1",
+    },
+]
+
+
+def get_cached_workspace(cache_dir) -> EagleIOWorkspace:
+    """Returns a workspace whose node tree is served from the on-disk cache."""
+    w = EagleIOWorkspace("test-key", cache_dir=str(cache_dir))
+    w._write_node_cache(NODES)
+    return EagleIOWorkspace("test-key", cache_dir=str(cache_dir))
+
+
+def hourly_data(hours: int) -> dict:
+    return {
+        f"2025-02-05T{h:02d}:00:00.000Z": {"f": 1000 + h, "T": h} for h in range(hours)
+    }
+
+
+def uploaded_timestamps(uploads) -> list[str]:
+    return [row["ts"] for _, data in uploads for row in data["data"]]
+
+
+def test_node_cache(tmp_path):
+    w = get_cached_workspace(tmp_path)
+    assert w.get_datasource_id_by_name("LW-02S") == "ds1"
+    assert w.get_children_ids("ds1") == ["p1", "p2"]
+    assert len(w.nodes) == len(NODES)
+
+    # Other API keys do not share the cache
+    other = EagleIOWorkspace("other-key", cache_dir=str(tmp_path))
+    assert other._read_node_cache() is None
+
+    # Stale caches are ignored
+    stale = EagleIOWorkspace("test-key", cache_dir=str(tmp_path), cache_ttl=-1)
+    assert stale._read_node_cache() is None
+
+    w.invalidate_node_cache()
+    assert w._read_node_cache() is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_get_datasource_id_by_name(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        assert e.get_datasource_id_by_name("LW-02S") == "ds1"
+        assert e.get_children_ids("ds1") == ["p1", "p2"]
+
+
+def test_get_latest_timestamps(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        results = e.get_latest_timestamps_from_datasources_by_name(
+            ["LW-02S", "Nonexistent Datasource"]
+        )
+    assert results == {
+        "LW-02S": "2025-02-05T18:00:00.000Z",
+        "Nonexistent Datasource": None,
+    }
+
+
+def test_get_watermarks(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        results = e.get_watermarks(["LW-02S", "Nonexistent Datasource"])
+    assert results == {
+        "LW-02S": "2025-02-05T18:00:00.000Z",
+        "Nonexistent Datasource": None,
+    }
+
+
+def test_get_historic_data(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        df = e.get_historic_data(
+            ["p1", "p2"],
+            "2025-02-05T00:00:00.000Z",
+            "2025-02-06T00:00:00.000Z",
+            slice_days=1 / 24,
+        )
+    assert list(df.columns) == ["p1", "p2"]
+    assert str(df.index.tz) == "UTC"
+    assert list(df.index.strftime("%H")) == ["17", "18", "19"]
+    assert np.allclose(df["p1"].to_numpy(), [1.5, np.nan, 2.5], equal_nan=True)
+    assert np.allclose(df["p2"].to_numpy(), [10, 20, np.nan], equal_nan=True)
+
+
+def test_load_data_to_datasource(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.load_data_to_datasource(
+            "LW-02S", hourly_data(2), NAMES_MAPPER, UNITS
+        )
+    assert (summary["rows"], summary["chunks"]) == (2, 1)
+    assert summary["sent_bytes"] == summary["bytes"]
+
+    path, data = eagleio_stub.uploads[0]
+    assert path == "/api/v1/nodes/ds1/historic"
+    assert data["data"][1] == {
+        "ts": "2025-02-05T01:00:00.000Z",
+        "f": {"0": {"v": 1001}, "1": {"v": 1}},
+    }
+
+
+def test_load_data_to_datasource_empty(eagleio_stub):
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.load_data_to_datasource("LW-02S", {}, NAMES_MAPPER, UNITS)
+    assert summary["rows"] == summary["chunks"] == summary["bytes"] == 0
+    assert eagleio_stub.uploads == []
+
+
+def test_load_data_to_datasource_in_chunks(eagleio_stub):
+    data = hourly_data(10)
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.load_data_to_datasource(
+            "LW-02S", data, NAMES_MAPPER, UNITS, chunk_rows=3, max_workers=4
+        )
+    assert (summary["rows"], summary["chunks"]) == (10, 4)
+    assert sorted(uploaded_timestamps(eagleio_stub.uploads)) == list(data)
+
+
+def test_load_data_to_datasource_chunk_bytes(eagleio_stub):
+    data = hourly_data(10)
+    header = jts.encode_header(["f", "T"], NAMES_MAPPER, UNITS)
+    rows = jts.encode_rows(*jts.object_data_to_columns(data))
+    chunk_bytes = len(jts.build_document(header, rows[:4]))
+
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.load_data_to_datasource(
+            "LW-02S", data, NAMES_MAPPER, UNITS, chunk_bytes=chunk_bytes
+        )
+    assert summary["chunks"] == len(eagleio_stub.uploads) > 1
+    for _, doc in eagleio_stub.uploads:
+        assert len(jts.build_document(header, rows[: len(doc["data"])])) <= chunk_bytes
+    assert uploaded_timestamps(eagleio_stub.uploads) == list(data)
+
+
+def test_load_data_to_datasource_retries_failed_chunks(eagleio_stub):
+    data = hourly_data(10)
+
+    # The first two chunks fail, then are retried in order after the others
+    eagleio_stub.fail_puts = 2
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.load_data_to_datasource(
+            "LW-02S", data, NAMES_MAPPER, UNITS, chunk_rows=3
+        )
+    assert summary["chunks"] == 4
+    assert [doc["data"][0]["ts"] for _, doc in eagleio_stub.uploads] == [
+        "2025-02-05T06:00:00.000Z",
+        "2025-02-05T09:00:00.000Z",
+        "2025-02-05T00:00:00.000Z",
+        "2025-02-05T03:00:00.000Z",
+    ]
+
+    # A chunk still failing after all retries stops the upload
+    eagleio_stub.uploads.clear()
+    eagleio_stub.fail_puts = 100
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        try:
+            e.load_data_to_datasource(
+                "LW-02S", data, NAMES_MAPPER, UNITS, chunk_rows=3, retries=1
+            )
+        except ValueError as exc:
+            assert str(exc).startswith("Failed to load chunk 1 of 4")
+        else:
+            raise AssertionError("Expected ValueError for a failing chunk")
+    assert eagleio_stub.uploads == []
+
+
+def test_load_data_to_datasource_compressed(eagleio_stub):
+    data = hourly_data(24)
+
+    # Compressed body accepted
+    with EagleIOWorkspace(
+        "test-key", base_url=eagleio_stub.base_url, compress=True
+    ) as e:
+        summary = e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+        assert e.compress
+    assert summary["sent_bytes"] < summary["bytes"]
+    assert len(eagleio_stub.uploads[0][1]["data"]) == 24
+
+    # Compressed body rejected, by the server or a proxy, resent uncompressed
+    eagleio_stub.accept_gzip = False
+    for status in [415, 400, 411, 413]:
+        eagleio_stub.uploads.clear()
+        eagleio_stub.gzip_status = status
+        with EagleIOWorkspace(
+            "test-key", base_url=eagleio_stub.base_url, compress=True
+        ) as e:
+            summary = e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+            assert not e.compress
+        assert summary["sent_bytes"] == summary["bytes"]
+        assert len(eagleio_stub.uploads) == 1
+
+
+def test_stream_data_to_datasource(eagleio_stub):
+    with EagleIOWorkspace(
+        "test-key", base_url=eagleio_stub.base_url, compress=True
+    ) as e:
+        # Sent uncompressed until a buffered upload was accepted compressed
+        for compressed in [False, True]:
+            eagleio_stub.uploads.clear()
+            summary = e.stream_data_to_datasource(
+                "LW-02S",
+                iter(hourly_data(24).items()),
+                NAMES_MAPPER,
+                UNITS,
+                batch_rows=5,
+            )
+            assert summary["rows"] == 24
+            assert (summary["sent_bytes"] < summary["bytes"]) == compressed
+
+            path, data = eagleio_stub.uploads[0]
+            assert path == "/api/v1/nodes/ds1/historic"
+            assert len(data["data"]) == 24
+            assert data["data"][23] == {
+                "ts": "2025-02-05T23:00:00.000Z",
+                "f": {"0": {"v": 1023}, "1": {"v": 23}},
+            }
+            e.load_data_to_datasource("LW-02S", hourly_data(1), NAMES_MAPPER, UNITS)
+
+    # Never compressed when the server rejects gzip
+    eagleio_stub.accept_gzip = False
+    with EagleIOWorkspace(
+        "test-key", base_url=eagleio_stub.base_url, compress=True
+    ) as e:
+        e.load_data_to_datasource("LW-02S", hourly_data(1), NAMES_MAPPER, UNITS)
+        summary = e.stream_data_to_datasource(
+            "LW-02S", iter(hourly_data(24).items()), NAMES_MAPPER, UNITS
+        )
+    assert summary["sent_bytes"] == summary["bytes"]
+
+
+def test_stream_chunks_to_datasource(eagleio_stub):
+    def chunks():
+        for day in range(3):
+            timestamps = np.arange(
+                f"2025-02-0{day + 1}T00:00",
+                f"2025-02-0{day + 2}T00:00",
+                60,
+                dtype="datetime64[m]",
+            )
+            yield timestamps, {"water_elevation": np.full(len(timestamps), 280.5)}
+
+    with EagleIOWorkspace("test-key", base_url=eagleio_stub.base_url) as e:
+        summary = e.stream_chunks_to_datasource(
+            "LW-02S",
+            chunks(),
+            {"water_elevation": "Water Elevation (ft)"},
+            {"water_elevation": "ft"},
+        )
+    assert summary["rows"] == 72
+
+    _, data = eagleio_stub.uploads[0]
+    assert len(data["data"]) == 72
+    assert data["data"][25] == {
+        "ts": "2025-02-02T01:00:00.000Z",
+        "f": {"0": {"v": 280.5}},
+    }
+
+
+def test_load_data_to_datasource_deduplicated(eagleio_stub, tmp_path):
+    data = hourly_data(10)
+    dedup = UploadDeduplicator(str(tmp_path / "sent_rows.sqlite"))
+
+    with EagleIOWorkspace(
+        "test-key", base_url=eagleio_stub.base_url, deduplicator=dedup
+    ) as e:
+        first = e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+        data["2025-02-05T03:00:00.000Z"]["f"] = 0
+        second = e.load_data_to_datasource("LW-02S", data, NAMES_MAPPER, UNITS)
+        third = e.stream_data_to_datasource(
+            "LW-02S", iter(data.items()), NAMES_MAPPER, UNITS
+        )
+    assert (first["rows"], first["skipped_rows"]) == (10, 0)
+    assert (second["rows"], second["skipped_rows"]) == (1, 9)
+    assert (third["rows"], third["skipped_rows"]) == (0, 10)
+    assert len(eagleio_stub.uploads) == 2
+    assert eagleio_stub.uploads[1][1]["data"] == [
+        {"ts": "2025-02-05T03:00:00.000Z", "f": {"0": {"v": 0}, "1": {"v": 3}}}
+    ]
+
+
+def test_format_timestamp_milliseconds():
+    dt = datetime(2025, 2, 5, 18, 0, 0, 123456, tzinfo=timezone.utc)
+    assert EagleIOWorkspace._format_timestamp(dt) == "2025-02-05T18:00:00.123Z"
+    dt = datetime(2025, 2, 5, 18, tzinfo=timezone.utc)
+    assert EagleIOWorkspace._format_timestamp(dt) == "2025-02-05T18:00:00.000Z"